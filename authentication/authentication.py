@@ -0,0 +1,46 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .cache import build_user, user_snapshots
+from .models import User
+from .revocation import revoked_tokens
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds ``request.user`` from token claims and the
+    user snapshot cache instead of loading the ``User`` row on every request.
+    Tokens revoked by logout or refresh rotation are rejected.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        self.sync_revocations()
+        if revoked_tokens.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken('Token has been revoked')
+        return validated_token
+
+    def sync_revocations(self):
+        revoked_tokens.sync_if_due()
+
+    def get_user_id(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken('Token contained no recognizable user identification') from e
+        # Tokens carry the id as a string; cache keys use the model's own type
+        return User._meta.get_field(api_settings.USER_ID_FIELD).to_python(user_id)
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        snapshot = user_snapshots.get(user_id, validated_token)
+        if snapshot is None:
+            snapshot = user_snapshots.load(user_id)
+        return self.check_user(snapshot)
+
+    def check_user(self, snapshot):
+        if snapshot.get('deleted'):
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return build_user(snapshot)
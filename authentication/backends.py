@@ -0,0 +1,51 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from .hashers import password_pool
+from .models import User
+
+
+class PooledHashingBackend(ModelBackend):
+    """
+    ``ModelBackend`` that verifies passwords on the bounded hashing pool and
+    upgrades the stored hash when it was made with another hasher or older
+    cost parameters.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            password_pool.run(make_password, password)
+            return None
+
+        is_correct, must_update = password_pool.run(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = password_pool.run(make_password, password)
+            user.save(update_fields=['password'])
+        return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await User._default_manager.aget_by_natural_key(username)
+        except User.DoesNotExist:
+            await password_pool.arun(make_password, password)
+            return None
+
+        is_correct, must_update = await password_pool.arun(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = await password_pool.arun(make_password, password)
+            await user.asave(update_fields=['password'])
+        return user
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from .models import User
+from .revocation import revoked_tokens
+
+# User fields carried in token claims and kept in the snapshot cache
+SNAPSHOT_FIELDS = ('id', 'email', 'name', 'is_active', 'is_staff')
+
+
+def user_claims(user):
+    return {field: getattr(user, field) for field in SNAPSHOT_FIELDS if field != 'id'}
+
+
+def snapshot_from_claims(user_id, token):
+    """Snapshot built from the token alone, or None for tokens issued without the user claims"""
+    if any(field not in token for field in SNAPSHOT_FIELDS if field != 'id'):
+        return None
+    return {'id': user_id, **{field: token[field] for field in SNAPSHOT_FIELDS if field != 'id'}}
+
+
+class UserSnapshotCache:
+    """
+    Lightweight user records for authentication, so a request with a valid
+    JWT needs no ``User`` query.
+
+    Lookups go through a small per-process LRU with a TTL, then the shared
+    Django cache, which holds the current snapshot of every user saved or
+    deleted since it was last cleared, and finally the token's own claims.
+    Saving a user overwrites both cache levels, so deactivation and profile
+    changes take effect immediately in this process and within
+    ``AUTH_USER_CACHE_TTL`` seconds in the others. Claims are not trusted
+    for tokens issued before the user's ``TokenCutoff``, which survives
+    cache evictions; those tokens, and tokens without claims, fall back to
+    one narrow query.
+    """
+    key_prefix = 'auth-user'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    @property
+    def shared(self):
+        return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+    def make_key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def get(self, user_id, token):
+        """Snapshot for ``user_id`` without touching the database, or None if it must be loaded"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        snapshot = self.shared.get(self.make_key(user_id))
+        if snapshot is None and not revoked_tokens.claims_outdated(user_id, token):
+            snapshot = snapshot_from_claims(user_id, token)
+        if snapshot is not None:
+            self.remember(user_id, snapshot)
+        return snapshot
+
+    def load(self, user_id):
+        row = User.objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+        return self.loaded(user_id, row)
+
+    async def aload(self, user_id):
+        row = await User.objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).afirst()
+        return self.loaded(user_id, row)
+
+    def loaded(self, user_id, row):
+        snapshot = row or {'id': user_id, 'deleted': True}
+        with self.lock:
+            self.loads += 1
+        self.remember(user_id, snapshot)
+        return snapshot
+
+    def remember(self, user_id, snapshot):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + settings.AUTH_USER_CACHE_TTL, snapshot)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def store(self, user_id, snapshot):
+        """Record the current state of a user that was just saved or deleted"""
+        self.shared.set(self.make_key(user_id), snapshot, None)
+        self.remember(user_id, snapshot)
+
+    def user_saved(self, user):
+        self.store(user.pk, {field: getattr(user, field) for field in SNAPSHOT_FIELDS})
+
+    def user_deleted(self, user_id):
+        self.store(user_id, {'id': user_id, 'deleted': True})
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'database_loads': self.loads,
+            }
+
+
+def build_user(snapshot):
+    """
+    An ``authentication.User`` holding only the snapshot fields.
+
+    The remaining fields are deferred, so code that needs them (the password
+    hash, timestamps) loads them on first access and everything else works
+    without a query. Saving it only writes the loaded fields.
+    """
+    values = [snapshot.get(field.attname, DEFERRED) if field.attname in SNAPSHOT_FIELDS else DEFERRED
+              for field in User._meta.concrete_fields]
+    return User.from_db(DEFAULT_DB_ALIAS, [field.attname for field in User._meta.concrete_fields], values)
+
+
+user_snapshots = UserSnapshotCache()
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the iteration count from ``PBKDF2_ITERATIONS``"""
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with N, r and p from ``SCRYPT_WORK_FACTOR``, ``SCRYPT_BLOCK_SIZE`` and ``SCRYPT_PARALLELISM``"""
+
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * N * r bytes; leave headroom above OpenSSL's 32MB default
+        return max(32 * 1024 * 1024, 2 * 128 * self.work_factor * self.block_size)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with costs from ``ARGON2_TIME_COST``, ``ARGON2_MEMORY_COST`` and ``ARGON2_PARALLELISM``"""
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class PasswordHashPoolBusy(Exception):
+    pass
+
+
+class PasswordHashPool:
+    """
+    Runs password hashing on a fixed number of threads.
+
+    The hash functions release the GIL, so ``PASSWORD_HASH_WORKERS`` threads
+    use that many cores while request threads (or the event loop) only wait.
+    At most ``PASSWORD_HASH_MAX_PENDING`` hashes may be queued or running;
+    callers that cannot get a slot within ``PASSWORD_HASH_QUEUE_TIMEOUT``
+    seconds get ``PasswordHashPoolBusy`` so a login storm is shed instead of
+    piling up behind the CPU.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+
+    def start(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+                )
+                self.slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+    def submit(self, func, *args):
+        self.start()
+        if not self.slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+            raise PasswordHashPoolBusy('Too many password hashes in progress')
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def run(self, func, *args):
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        self.start()
+        # Wait for a slot off the event loop
+        if not await asyncio.to_thread(self.slots.acquire, timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+            raise PasswordHashPoolBusy('Too many password hashes in progress')
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        return await asyncio.wrap_future(future)
+
+
+password_pool = PasswordHashPool()
@@ -0,0 +1,185 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, connections, router
+from django.utils import timezone
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginQueue:
+    """
+    Write-behind buffer for ``User.last_login``.
+
+    Logins record the timestamp in memory instead of updating the user row,
+    so a login storm does not queue on row locks. The buffer keeps the
+    latest timestamp per user and is written in one statement per
+    ``LAST_LOGIN_FLUSH_SIZE`` users: on PostgreSQL an
+    ``UPDATE ... FROM (VALUES ...)`` that never moves a timestamp backwards,
+    elsewhere ``bulk_update``. Flushes run on a timer thread, which closes its
+    own connections: ``LAST_LOGIN_FLUSH_SECONDS`` after the first buffered
+    login (so an idle worker does not hold timestamps indefinitely), or at
+    once when a finished request finds the oldest entry that old or the
+    buffer at ``LAST_LOGIN_FLUSH_SIZE``. The buffer is also flushed at
+    interpreter exit. Rows that fail to write go back into the buffer for
+    the next flush.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.oldest = None
+        self.timer = None
+        self.flushes = 0
+        self.written = 0
+        self.failures = 0
+        self.last_flush_at = None
+        self.last_flush_ms = None
+
+    def record(self, user, when=None):
+        when = when or timezone.now()
+        with self.lock:
+            current = self.pending.get(user.pk)
+            if current is None or current < when:
+                self.pending[user.pk] = when
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+                self.schedule()
+
+    def schedule(self, delay=None):
+        """Start the timer that flushes the buffer after ``delay`` seconds; called with the lock held"""
+        if self.timer is None:
+            delay = settings.LAST_LOGIN_FLUSH_SECONDS if delay is None else delay
+            self.timer = threading.Timer(delay, self.flush_from_timer)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not flush last_login timestamps from the timer')
+        finally:
+            # The timer thread's connections are not closed by any request cycle
+            connections.close_all()
+
+    def flush_due(self):
+        with self.lock:
+            if self.oldest is None:
+                return False
+            return (
+                len(self.pending) >= settings.LAST_LOGIN_FLUSH_SIZE
+                or time.monotonic() - self.oldest >= settings.LAST_LOGIN_FLUSH_SECONDS
+            )
+
+    def request_finished(self, sender, **kwargs):
+        # Not on the request thread: its connection may already be closed by
+        # another request_finished receiver, and reopening it would leak it
+        if self.flush_due():
+            with self.lock:
+                timer, self.timer = self.timer, None
+                self.schedule(delay=0)
+            if timer is not None:
+                timer.cancel()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of users written"""
+        with self.lock:
+            batch, oldest, timer = self.pending, self.oldest, self.timer
+            self.pending, self.oldest, self.timer = {}, None, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not batch:
+            return 0
+
+        started = time.monotonic()
+        rows = sorted(batch.items())
+        size = settings.LAST_LOGIN_FLUSH_SIZE
+        written = 0
+        try:
+            for start in range(0, len(rows), size):
+                chunk = rows[start:start + size]
+                self.write(chunk)
+                written += len(chunk)
+        except DatabaseError:
+            logger.exception('Could not write %d last_login timestamps; keeping them for the next flush', len(rows) - written)
+            self.requeue(rows[written:], oldest)
+            with self.lock:
+                self.failures += 1
+
+        with self.lock:
+            self.flushes += 1
+            self.written += written
+            self.last_flush_at = timezone.now()
+            self.last_flush_ms = round((time.monotonic() - started) * 1000, 3)
+        return written
+
+    def requeue(self, rows, oldest):
+        with self.lock:
+            for user_id, when in rows:
+                current = self.pending.get(user_id)
+                if current is None or current < when:
+                    self.pending[user_id] = when
+            self.oldest = min(oldest, self.oldest) if self.oldest is not None else oldest
+            self.schedule()
+
+    def clear(self):
+        """Drop everything buffered without writing it"""
+        with self.lock:
+            timer = self.timer
+            self.pending, self.oldest, self.timer = {}, None, None
+        if timer is not None:
+            timer.cancel()
+
+    def write(self, rows):
+        alias = router.db_for_write(User)
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            User.objects.using(alias).bulk_update(
+                [User(pk=user_id, last_login=when) for user_id, when in rows], ['last_login']
+            )
+            return
+
+        quote = connection.ops.quote_name
+        table = quote(User._meta.db_table)
+        pk = quote(User._meta.pk.column)
+        column = quote(User._meta.get_field('last_login').column)
+        values = ', '.join(['(%s::bigint, %s::timestamptz)'] * len(rows))
+        params = [value for row in rows for value in row]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS u SET {column} = v.last_login "
+                f"FROM (VALUES {values}) AS v(id, last_login) "
+                f"WHERE u.{pk} = v.id AND (u.{column} IS NULL OR u.{column} < v.last_login)",
+                params,
+            )
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pending': len(self.pending),
+                # How far the stored last_login values may lag behind logins
+                'lag_seconds': round(time.monotonic() - self.oldest, 3) if self.oldest is not None else 0,
+                'flushes': self.flushes,
+                'written': self.written,
+                'failures': self.failures,
+                'last_flush_at': self.last_flush_at,
+                'last_flush_ms': self.last_flush_ms,
+            }
+
+
+def flush_at_exit():
+    try:
+        last_logins.flush()
+    except Exception:
+        logger.exception('Could not flush last_login timestamps at exit')
+
+
+last_logins = LastLoginQueue()
+request_finished.connect(last_logins.request_finished, dispatch_uid='last-login-flush')
+atexit.register(flush_at_exit)
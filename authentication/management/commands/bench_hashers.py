@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = "Report password verifications (logins) per second per core for each configured hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers', nargs='+', choices=list(settings.TUNED_PASSWORD_HASHERS),
+            default=list(settings.TUNED_PASSWORD_HASHERS), help='Hashers to benchmark',
+        )
+        parser.add_argument('--seconds', type=float, default=3, help='Time spent on each measurement')
+        parser.add_argument(
+            '--workers', type=int, default=settings.PASSWORD_HASH_WORKERS,
+            help='Threads for the parallel measurement (default: PASSWORD_HASH_WORKERS)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{os.cpu_count()} CPUs, parallel run with {options['workers']} threads")
+        self.stdout.write(f"{'hasher':<8} {'ms/login':>9} {'per core/s':>11} {'parallel/s':>11}  parameters")
+        for name in options['hashers']:
+            hasher = import_string(settings.TUNED_PASSWORD_HASHERS[name])()
+            try:
+                encoded = hasher.encode('correct horse battery staple', hasher.salt())
+            except ValueError as e:
+                # e.g. argon2-cffi is not installed
+                self.stdout.write(self.style.WARNING(f'{name:<8} skipped: {e}'))
+                continue
+
+            serial = self.measure(hasher, encoded, 1, options['seconds'])
+            parallel = self.measure(hasher, encoded, options['workers'], options['seconds'])
+            parameters = ', '.join(f'{key}={value}' for key, value in hasher.decode(encoded).items()
+                                   if key not in ('algorithm', 'hash', 'salt'))
+            self.stdout.write(
+                f"{name:<8} {1000 / serial:>9.1f} {serial:>11.1f} {parallel:>11.1f}  {parameters}"
+            )
+
+    def measure(self, hasher, encoded, workers, seconds):
+        deadline = time.perf_counter() + seconds
+
+        def verify_until_deadline():
+            count = 0
+            while time.perf_counter() < deadline:
+                hasher.verify('correct horse battery staple', encoded)
+                count += 1
+            return count
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            total = sum(executor.map(lambda _: verify_until_deadline(), range(workers)))
+        return total / (time.perf_counter() - started)
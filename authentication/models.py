@@ -11,4 +11,23 @@ class User(AbstractUser):
     REQUIRED_FIELDS = ['username', 'name']
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+class RevokedToken(models.Model):
+    """JWT that must no longer be accepted (logged out or rotated), kept until it expires"""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (expires {self.expires_at})"
+
+class TokenCutoff(models.Model):
+    """Claims in a user's tokens issued before ``not_before`` are outdated (deactivated, demoted or deleted since)"""
+    # Plain column rather than a foreign key: the row must outlive a deleted user
+    user_id = models.BigIntegerField(unique=True)
+    not_before = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"user {self.user_id} (tokens before {self.not_before})"
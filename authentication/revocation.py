@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.settings import api_settings
+from .models import RevokedToken, TokenCutoff
+
+# Re-read rows revoked this long before the previous sync, to cover clock
+# skew between workers and inserts that commit out of id/time order
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevokedTokenStore:
+    """
+    Revoked JWT ids, checked in memory on every authenticated request.
+
+    ``RevokedToken`` rows are the shared record; each process keeps a dict
+    of ``jti -> expiry`` and pulls rows revoked since its last sync at most
+    every ``REVOKED_TOKENS_SYNC_SECONDS``, so a logout reaches every worker
+    within that interval without a query per request. Entries are dropped
+    from memory once their token has expired (it would be rejected anyway),
+    compacting the dict every ``REVOKED_TOKENS_COMPACT_SECONDS``; the
+    ``prune_revoked_tokens`` command does the same for the table.
+
+    ``TokenCutoff`` rows are synced the same way: a user's tokens issued
+    before the cutoff are not trusted for their claims any more, so a
+    deactivation or demotion is durable even once the user snapshot cache
+    has lost it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.cutoffs = {}
+        self.synced_at = None
+        self.next_sync = 0
+        self.next_compaction = 0
+
+    def is_revoked(self, jti):
+        return jti in self.entries
+
+    def claims_outdated(self, user_id, token):
+        """Whether ``token`` was issued before the user's last cutoff"""
+        cutoff = self.cutoffs.get(user_id)
+        return cutoff is not None and token.get('iat', 0) <= cutoff
+
+    def sync_due(self):
+        return time.monotonic() >= self.next_sync
+
+    def sync_if_due(self):
+        if self.sync_due():
+            self.sync()
+
+    async def async_sync_if_due(self):
+        if self.sync_due():
+            await sync_to_async(self.sync)()
+
+    def sync(self):
+        with self.lock:
+            # Claim the sync so concurrent requests keep using the current entries
+            self.next_sync = time.monotonic() + settings.REVOKED_TOKENS_SYNC_SECONDS
+            since = self.synced_at
+        started = datetime.now(timezone.utc)
+        rows = RevokedToken.objects.filter(expires_at__gt=started)
+        if since is not None:
+            rows = rows.filter(revoked_at__gte=since - SYNC_OVERLAP)
+        revoked = {jti: expires_at.timestamp() for jti, expires_at in rows.values_list('jti', 'expires_at')}
+        # Older cutoffs only concern tokens that have expired
+        cutoffs = TokenCutoff.objects.filter(not_before__gt=started - api_settings.ACCESS_TOKEN_LIFETIME)
+        if since is not None:
+            cutoffs = cutoffs.filter(updated_at__gte=since - SYNC_OVERLAP)
+        cutoffs = {user_id: not_before.timestamp() for user_id, not_before in cutoffs.values_list('user_id', 'not_before')}
+        with self.lock:
+            self.entries.update(revoked)
+            self.cutoffs.update(cutoffs)
+            self.synced_at = started
+        self.compact_if_due()
+
+    def compact_if_due(self):
+        now = time.time()
+        with self.lock:
+            if time.monotonic() < self.next_compaction:
+                return
+            self.next_compaction = time.monotonic() + settings.REVOKED_TOKENS_COMPACT_SECONDS
+            self.entries = {jti: expires for jti, expires in self.entries.items() if expires > now}
+            oldest = now - api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+            self.cutoffs = {user_id: cutoff for user_id, cutoff in self.cutoffs.items() if cutoff > oldest}
+
+    def revoke(self, token):
+        """
+        Revoke a validated token. Returns False if it was already revoked,
+        which for a refresh token means it has been used before.
+        """
+        jti = token[api_settings.JTI_CLAIM]
+        expires = token['exp']
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=datetime.fromtimestamp(expires, timezone.utc))
+        except IntegrityError:
+            revoked = False
+        else:
+            revoked = True
+        with self.lock:
+            self.entries[jti] = expires
+        return revoked
+
+    def cut_off(self, user_id):
+        """Stop trusting the claims of every token issued to ``user_id`` so far"""
+        now = datetime.now(timezone.utc)
+        TokenCutoff.objects.update_or_create(user_id=user_id, defaults={'not_before': now})
+        with self.lock:
+            self.cutoffs[user_id] = now.timestamp()
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self.cutoffs = {}
+            self.synced_at = None
+            self.next_sync = 0
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'cutoffs': len(self.cutoffs), 'synced_at': self.synced_at}
+
+
+revoked_tokens = RevokedTokenStore()
@@ -1,7 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from .hashers import password_pool
 from .models import User
+from .revocation import revoked_tokens
+from .tokens import UserClaimsRefreshToken
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -18,12 +25,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(
-            username=validated_data['email'],
-            email=validated_data['email'],
+        # Hashed on the bounded pool, like logins, rather than by create_user on the request thread
+        user = User(
+            username=User.normalize_username(validated_data['email']),
+            email=User.objects.normalize_email(validated_data['email']),
             name=validated_data['name'],
-            password=validated_data['password']
+            password=password_pool.run(make_password, validated_data['password'])
         )
+        user.save()
         return user
 
 class UserLoginSerializer(serializers.Serializer):
@@ -46,6 +55,32 @@ class UserLoginSerializer(serializers.Serializer):
         
         return attrs
 
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        try:
+            token = UserClaimsRefreshToken(attrs['refresh'])
+        except TokenError:
+            raise serializers.ValidationError('Invalid or expired refresh token')
+
+        revoked_tokens.sync_if_due()
+        if revoked_tokens.is_revoked(token[api_settings.JTI_CLAIM]):
+            raise serializers.ValidationError('Refresh token has been revoked')
+
+        # The new tokens carry claims from this row, so read it from the primary
+        # rather than from caches or a replica that may predate a deactivation
+        user = User.objects.using(DEFAULT_DB_ALIAS).filter(
+            **{api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None:
+            raise serializers.ValidationError('User not found')
+        if not user.is_active:
+            raise serializers.ValidationError('User account is disabled')
+        attrs['user'] = user
+        attrs['token'] = token
+        return attrs
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
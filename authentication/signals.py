@@ -0,0 +1,34 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .cache import user_snapshots
+from .models import User
+from .revocation import revoked_tokens
+
+# Flags whose loss must not be undone by the claims in older tokens
+CLAIMED_FLAGS = ('is_active', 'is_staff')
+
+
+@receiver(pre_save, sender=User)
+def cut_off_outdated_claims(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(CLAIMED_FLAGS) & set(update_fields):
+        return
+    previous = User.objects.using(using).filter(pk=instance.pk).values(*CLAIMED_FLAGS).first()
+    if previous and any(previous[flag] and not getattr(instance, flag) for flag in CLAIMED_FLAGS):
+        revoked_tokens.cut_off(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def refresh_user_snapshot(sender, instance, using, **kwargs):
+    # Shared with every worker, so only once the database has the change too
+    transaction.on_commit(partial(user_snapshots.user_saved, instance), using=using)
+
+
+@receiver(post_delete, sender=User)
+def forget_user_snapshot(sender, instance, using, **kwargs):
+    revoked_tokens.cut_off(instance.pk)
+    transaction.on_commit(partial(user_snapshots.user_deleted, instance.pk), using=using)
@@ -1,3 +1,390 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from healthcare_backend.throttling import TokenBucketThrottle
+from .cache import user_snapshots
+from .hashers import PasswordHashPoolBusy, password_pool
+from .lastlogin import last_logins
+from .models import RevokedToken, User
+from .revocation import revoked_tokens
+
+
+def make_owner():
+    return User.objects.create_user(
+        username='owner@example.com', email='owner@example.com', name='Owner', password='S3cure-pass!'
+    )
+
+
+class OwnerTestCase(TestCase):
+    """Test case with an owner account and an API client, force-authenticated as the owner unless ``authenticate`` is off"""
+    authenticate = True
+
+    def setUp(self):
+        cache.clear()
+        # Logins buffered by another test belong to its rolled-back transaction;
+        # never write them here or, at exit, to the development database
+        last_logins.clear()
+        self.addCleanup(last_logins.clear)
+        self.user = make_owner()
+        self.client = APIClient()
+        if self.authenticate:
+            self.client.force_authenticate(self.user)
+
+
+class ClaimsAuthenticationTests(OwnerTestCase):
+    """Authenticated requests build the user from token claims and the snapshot cache"""
+    authenticate = False
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post('/api/auth/login/', {
+            'email': 'owner@example.com', 'password': 'S3cure-pass!'
+        }, format='json')
+        self.access = response.json()['tokens']['access']
+        self.forget_snapshots()
+
+    def forget_snapshots(self):
+        cache.clear()
+        user_snapshots.clear()
+        # Revocations are synced at most every few seconds; keep the count deterministic
+        revoked_tokens.sync()
+
+    def test_claims_token_needs_no_user_query(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+
+    def test_token_without_claims_loads_user_once(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+
+    def test_deactivation_and_deletion_take_effect_immediately(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+
+        self.user.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+            self.user.delete()
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+
+    def test_rolled_back_save_does_not_reach_the_snapshot_cache(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.user.is_staff = True
+                self.user.save()
+                raise RuntimeError
+
+        # Another worker reads the shared snapshot, not this process's entries
+        user_snapshots.clear()
+        self.assertEqual(self.client.get('/api/diagnostics/database/').status_code, 403)
+
+    def test_deactivation_outlives_the_snapshot_cache(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.user.is_active = False
+        self.user.save()
+
+        # Evicted snapshots must not let the token's is_active claim back in
+        self.forget_snapshots()
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+        # Nor in a worker that only knows the cutoff from the database
+        revoked_tokens.clear()
+        self.forget_snapshots()
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+
+    def test_demotion_outlives_the_snapshot_cache(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post('/api/auth/login/', {
+            'email': 'owner@example.com', 'password': 'S3cure-pass!'
+        }, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['tokens']['access']}")
+        self.assertEqual(self.client.get('/api/diagnostics/database/').status_code, 200)
+
+        self.user.is_staff = False
+        self.user.save()
+        self.forget_snapshots()
+        self.assertEqual(self.client.get('/api/diagnostics/database/').status_code, 403)
+
+    def test_user_fields_outside_the_claims_load_on_access(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = self.client.post('/api/patients/', {
+            'name': 'New', 'email': 'new@example.com', 'phone': '5550100', 'date_of_birth': '1990-01-01',
+            'gender': 'F', 'address': '1 Main Street', 'medical_history': 'None',
+        }, format='json')
+        self.assertEqual(response.json()['patient']['created_by'], 'owner@example.com')
+
+
+class PasswordRehashTests(OwnerTestCase):
+    """Logins upgrade hashes made with another hasher or older cost parameters"""
+    authenticate = False
+
+    def login(self, password='S3cure-pass!'):
+        return self.client.post('/api/auth/login/', {'email': 'owner@example.com', 'password': password}, format='json')
+
+    @override_settings(PBKDF2_ITERATIONS=1000)
+    def test_legacy_hash_is_upgraded_on_login(self):
+        self.user.password = make_password('S3cure-pass!', hasher='pbkdf2_sha256')
+        self.user.save()
+
+        self.assertEqual(self.login('wrong-password').status_code, 401)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    def test_changed_cost_parameters_trigger_rehash(self):
+        with override_settings(SCRYPT_WORK_FACTOR=2 ** 12):
+            self.user.set_password('S3cure-pass!')
+            self.user.save()
+        self.assertIn('$4096$', self.user.password)
+
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIn(f'${2 ** 14}$', self.user.password)
+
+
+class PasswordHashPoolTests(OwnerTestCase):
+    """Logins and registrations hash on the bounded pool and shed load when it is full"""
+    authenticate = False
+
+    def register(self):
+        return self.client.post('/api/auth/register/', {
+            'name': 'New', 'email': 'new@example.com', 'password': 'S3cure-pass!', 'password_confirm': 'S3cure-pass!',
+        }, format='json')
+
+    def test_registration_hashes_on_the_pool(self):
+        with mock.patch('authentication.serializers.password_pool.run', wraps=password_pool.run) as run:
+            self.assertEqual(self.register().status_code, 201)
+        run.assert_called_once_with(make_password, 'S3cure-pass!')
+        self.assertTrue(User.objects.get(email='new@example.com').check_password('S3cure-pass!'))
+
+    def test_full_pool_sheds_logins_and_registrations(self):
+        with mock.patch.object(password_pool, 'run', side_effect=PasswordHashPoolBusy):
+            response = self.register()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            response = self.client.post('/api/auth/login/', {'email': 'owner@example.com', 'password': 'S3cure-pass!'}, format='json')
+            self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+
+
+@override_settings(THROTTLE_RATES={
+    'login.ip': '10/min', 'login.email': '2/min', 'register.ip': '3/min',
+    'default.user': '5/min', 'default.write': '1/min',
+})
+class ThrottleTests(OwnerTestCase):
+    """Token buckets reject abusive clients before any validation or hashing"""
+    authenticate = False
+
+    def setUp(self):
+        super().setUp()
+        # Leave no drained buckets behind for tests running at the default rates
+        self.addCleanup(cache.clear)
+
+    def login(self, email='owner@example.com'):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': 'wrong-password'}, format='json')
+
+    def test_login_is_limited_per_email_before_hashing(self):
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login('OWNER@example.com').status_code, 401)
+
+        with mock.patch('authentication.backends.password_pool.run') as run:
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        run.assert_not_called()
+
+        # Other accounts are still reachable from the same address
+        self.assertEqual(self.login('other@example.com').status_code, 401)
+
+    def test_register_is_limited_per_ip(self):
+        for attempt in range(3):
+            response = self.client.post('/api/auth/register/', {'email': f'new{attempt}@example.com'}, format='json')
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/auth/register/', {'email': 'new3@example.com'}, format='json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_bucket_refills_as_the_window_slides(self):
+        class ClientThrottle(TokenBucketThrottle):
+            scope, kind = 'login', 'email'
+
+            def get_ident_for(self, request):
+                return 'client'
+
+        clock = [600.0]
+        throttle = ClientThrottle()
+        throttle.timer = lambda: clock[0]
+
+        def allow():
+            return throttle.allow_request(None, None)
+
+        self.assertEqual([allow(), allow(), allow()], [True, True, False])
+        # Both counted requests must slide half out of the last minute
+        self.assertEqual(throttle.wait(), 90)
+        clock[0] = 689.0
+        self.assertFalse(allow())
+        clock[0] = 690.0
+        self.assertTrue(allow())
+        self.assertFalse(allow())
+
+    def test_viewset_writes_have_their_own_bucket(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/patients/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/patients/', {}, format='json').status_code, 429)
+
+        # Reads are limited separately, and other endpoints keep their own buckets
+        self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+        self.assertEqual(self.client.post('/api/doctors/', {}, format='json').status_code, 400)
+
+    def test_async_reads_share_the_viewset_bucket(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        for attempt in range(3):
+            self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+        for attempt in range(2):
+            self.assertEqual(self.client.get('/api/async/patients/').status_code, 200)
+
+        response = self.client.get('/api/async/patients/')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get('/api/patients/').status_code, 429)
+        self.assertEqual(self.client.get('/api/async/mappings/').status_code, 200)
+
+
+class TokenRevocationTests(OwnerTestCase):
+    """Refresh rotation and logout revoke tokens without a lookup per request"""
+    authenticate = False
+
+    def setUp(self):
+        super().setUp()
+        revoked_tokens.clear()
+        response = self.client.post('/api/auth/login/', {
+            'email': 'owner@example.com', 'password': 'S3cure-pass!'
+        }, format='json')
+        self.tokens = response.json()['tokens']
+
+    def refresh(self, refresh):
+        return self.client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+
+    def test_refresh_rotates_and_rejects_reuse(self):
+        response = self.refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['tokens']
+        self.assertNotEqual(rotated['refresh'], self.tokens['refresh'])
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+        self.assertEqual(self.refresh(rotated['refresh']).status_code, 200)
+
+    def test_refresh_is_refused_once_the_user_is_deactivated(self):
+        self.user.is_active = False
+        self.user.save()
+        # Even in a worker whose caches no longer know about it
+        cache.clear()
+        user_snapshots.clear()
+        revoked_tokens.clear()
+        response = self.refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['details']['non_field_errors'], ['User account is disabled'])
+
+    def test_logout_revokes_both_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        response = self.client.post('/api/auth/logout/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+    def test_revocations_from_other_workers_are_synced(self):
+        revoked_tokens.sync()
+        token = AccessToken(self.tokens['access'])
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(hours=1))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+
+        revoked_tokens.next_sync = 0
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=f'expired-{i}', expires_at=now - timedelta(minutes=1)) for i in range(5)]
+            + [RevokedToken(jti='live', expires_at=now + timedelta(minutes=1))]
+        )
+        call_command('prune_revoked_tokens', batch_size=2, stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class LastLoginQueueTests(OwnerTestCase):
+    """Logins buffer last_login and write it in batches"""
+    authenticate = False
+
+    def login(self):
+        return self.client.post('/api/auth/login/', {
+            'email': 'owner@example.com', 'password': 'S3cure-pass!'
+        }, format='json')
+
+    def test_login_defers_the_update(self):
+        with self.assertNumQueries(1):
+            # Only the user lookup; no UPDATE on the user row
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+        self.assertEqual(last_logins.stats()['pending'], 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(last_logins.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(last_logins.stats()['lag_seconds'], 0)
+
+    def test_timer_flushes_without_further_requests(self):
+        self.assertEqual(self.login().status_code, 200)
+        timer = last_logins.timer
+        self.assertTrue(timer.is_alive())
+        self.assertEqual(timer.interval, settings.LAST_LOGIN_FLUSH_SECONDS)
+
+        # Run the timer's flush here, where the test transaction is visible
+        timer.cancel()
+        with mock.patch.object(connections, 'close_all') as close_all:
+            timer.function()
+        close_all.assert_called_once_with()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertIsNone(last_logins.timer)
+
+    @override_settings(LAST_LOGIN_FLUSH_SIZE=1)
+    def test_full_buffer_is_flushed_off_the_request_thread(self):
+        with mock.patch('authentication.lastlogin.threading.Timer') as timer:
+            self.assertEqual(self.login().status_code, 200)
+        timer.assert_called_with(0, last_logins.flush_from_timer)
+        timer.return_value.start.assert_called_with()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        with mock.patch.object(connections, 'close_all'):
+            last_logins.flush_from_timer()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(last_logins.stats()['pending'], 0)
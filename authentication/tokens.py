@@ -0,0 +1,13 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+from .cache import user_claims
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user fields ``ClaimsJWTAuthentication`` reads"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
@@ -4,4 +4,6 @@ from . import views
 urlpatterns = [
     path('register/', views.register, name='register'),
     path('login/', views.login, name='login'),
+    path('refresh/', views.refresh, name='token-refresh'),
+    path('logout/', views.logout, name='logout'),
 ]
\ No newline at end of file
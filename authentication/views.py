@@ -1,19 +1,25 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .serializers import RefreshTokenSerializer, UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from .hashers import PasswordHashPoolBusy
+from .lastlogin import last_logins
+from .revocation import revoked_tokens
+from .tokens import UserClaimsRefreshToken
+from healthcare_backend.throttling import EmailTokenBucketThrottle, IPTokenBucketThrottle, scoped
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(scoped('register', IPTokenBucketThrottle, EmailTokenBucketThrottle))
 def register(request):
     """Register a new user"""
     try:
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = UserClaimsRefreshToken.for_user(user)
             
             return Response({
                 'message': 'User registered successfully',
@@ -29,6 +35,12 @@ def register(request):
             'details': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    except PasswordHashPoolBusy:
+        return Response({
+            'error': 'Registration temporarily unavailable',
+            'details': 'Too many registrations in progress, please retry shortly'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+    
     except Exception as e:
         return Response({
             'error': 'Internal server error',
@@ -37,13 +49,16 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(scoped('login', IPTokenBucketThrottle, EmailTokenBucketThrottle))
 def login(request):
     """Login user and return JWT tokens"""
     try:
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            refresh = UserClaimsRefreshToken.for_user(user)
+            if api_settings.UPDATE_LAST_LOGIN:
+                last_logins.record(user)
             
             return Response({
                 'message': 'Login successful',
@@ -59,6 +74,77 @@ def login(request):
             'details': serializer.errors
         }, status=status.HTTP_401_UNAUTHORIZED)
     
+    except PasswordHashPoolBusy:
+        return Response({
+            'error': 'Login temporarily unavailable',
+            'details': 'Too many logins in progress, please retry shortly'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+    
+    except Exception as e:
+        return Response({
+            'error': 'Internal server error',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes(scoped('refresh', IPTokenBucketThrottle))
+def refresh(request):
+    """Exchange a refresh token for new JWT tokens"""
+    try:
+        serializer = RefreshTokenSerializer(data=request.data)
+        if serializer.is_valid():
+            refresh = UserClaimsRefreshToken.for_user(serializer.validated_data['user'])
+            tokens = {'access': str(refresh.access_token)}
+            
+            if api_settings.ROTATE_REFRESH_TOKENS:
+                # The insert doubles as the reuse check across workers
+                if api_settings.BLACKLIST_AFTER_ROTATION and not revoked_tokens.revoke(serializer.validated_data['token']):
+                    return Response({
+                        'error': 'Token refresh failed',
+                        'details': 'Refresh token has already been used'
+                    }, status=status.HTTP_401_UNAUTHORIZED)
+                tokens['refresh'] = str(refresh)
+            
+            return Response({
+                'message': 'Token refreshed successfully',
+                'tokens': tokens
+            }, status=status.HTTP_200_OK)
+        
+        return Response({
+            'error': 'Token refresh failed',
+            'details': serializer.errors
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    except Exception as e:
+        return Response({
+            'error': 'Internal server error',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def logout(request):
+    """Revoke the refresh token and the access token used for this request"""
+    try:
+        serializer = RefreshTokenSerializer(data=request.data)
+        if serializer.is_valid():
+            if serializer.validated_data['user'].pk != request.user.pk:
+                return Response({
+                    'error': 'Logout failed',
+                    'details': 'Refresh token belongs to another user'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            revoked_tokens.revoke(serializer.validated_data['token'])
+            revoked_tokens.revoke(request.auth)
+            return Response({
+                'message': 'Logged out successfully'
+            }, status=status.HTTP_200_OK)
+        
+        return Response({
+            'error': 'Logout failed',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     except Exception as e:
         return Response({
             'error': 'Internal server error',
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBackend:
+    """Delivers events to subscribers in the same process only"""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, owner_id, event):
+        self.broker.dispatch(owner_id, event)
+
+    def start(self):
+        pass
+
+
+class PostgresNotifyBackend:
+    """
+    Fans events out across processes with PostgreSQL LISTEN/NOTIFY.
+
+    Publishing runs ``pg_notify`` on the request's connection; every worker
+    runs one listener thread on a dedicated connection that feeds the
+    notifications into its local broker.
+    """
+    channel = 'healthcare_events'
+    poll_timeout = 5
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def publish(self, owner_id, event):
+        payload = json.dumps({'owner': owner_id, 'event': event}, cls=JSONEncoder)
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.listen, name='event-listener', daemon=True)
+                self.thread.start()
+
+    def listen(self):
+        wrapper = connections['default']
+        connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+
+        while True:
+            for payload in self.wait_for_notifies(connection):
+                try:
+                    message = json.loads(payload)
+                    self.broker.dispatch(message['owner'], message['event'])
+                except (ValueError, KeyError):
+                    logger.warning('Ignoring malformed event notification: %r', payload)
+
+    def wait_for_notifies(self, connection):
+        if hasattr(connection, 'notifies') and callable(connection.notifies):
+            # psycopg 3
+            return [notify.payload for notify in connection.notifies(timeout=self.poll_timeout, stop_after=100)]
+        # psycopg2
+        if select.select([connection], [], [], self.poll_timeout) == ([], [], []):
+            return []
+        connection.poll()
+        payloads = [notify.payload for notify in connection.notifies]
+        connection.notifies.clear()
+        return payloads
+
+
+class EventBroker:
+    """
+    In-process fan-out of change events to SSE subscribers, keyed by owner.
+
+    Each subscriber gets a bounded ``asyncio.Queue`` bound to its event loop,
+    fed with ``(event type, JSON payload)`` pairs.
+    Events may be published from any thread (signal handlers run in sync
+    request threads), so delivery goes through ``call_soon_threadsafe``. A
+    subscriber whose queue is full misses events rather than stalling the
+    publisher; the stream tells it to resynchronise.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = import_string(settings.EVENT_BROKER_BACKEND)(self)
+        return self._backend
+
+    def subscribe(self, owner_id):
+        self.backend.start()
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE))
+        with self.lock:
+            self.subscribers[owner_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, owner_id, subscriber):
+        with self.lock:
+            self.subscribers[owner_id].discard(subscriber)
+            if not self.subscribers[owner_id]:
+                del self.subscribers[owner_id]
+
+    def subscriber_count(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def publish(self, owner_id, event):
+        """Publish ``event`` to ``owner_id``'s subscribers; call it from ``transaction.on_commit``"""
+        self.backend.publish(owner_id, event)
+
+    def dispatch(self, owner_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(owner_id, ()))
+        if not subscribers:
+            return
+        # Encode once and wake each event loop once, however many subscribers share it
+        message = (event['type'], json.dumps(event, cls=JSONEncoder))
+        queues_by_loop = defaultdict(list)
+        for loop, queue in subscribers:
+            queues_by_loop[loop].append(queue)
+        for loop, queues in queues_by_loop.items():
+            loop.call_soon_threadsafe(self.deliver, queues, message)
+
+    def deliver(self, queues, message):
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                queue.overflowed = True
+
+
+broker = EventBroker()
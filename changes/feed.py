@@ -0,0 +1,147 @@
+import base64
+import heapq
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from .models import Tombstone
+
+# Rows sort before tombstones that share a timestamp
+ROW_RANK, TOMBSTONE_RANK = 0, 1
+
+# Start of the oldest other transaction that has written and not committed yet
+OLDEST_OPEN_WRITE_QUERY = {
+    'postgresql': (
+        "SELECT min(xact_start) FROM pg_stat_activity "
+        "WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+    ),
+}
+
+
+def encode_cursor(changed_at, rank, pk):
+    payload = json.dumps([changed_at.isoformat(), rank, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(encoded):
+    padding = '=' * (-len(encoded) % 4)
+    changed_at, rank, pk = json.loads(base64.urlsafe_b64decode(encoded + padding))
+    changed_at = parse_datetime(changed_at)
+    if changed_at is None or rank not in (ROW_RANK, TOMBSTONE_RANK):
+        raise ValueError('Malformed cursor')
+    return changed_at, rank, int(pk)
+
+
+def after(field, cursor, rank):
+    """Filter for entries of ``rank`` that sort after ``cursor``"""
+    changed_at, cursor_rank, pk = cursor
+    if rank < cursor_rank:
+        return Q(**{f'{field}__gt': changed_at})
+    if rank > cursor_rank:
+        return Q(**{f'{field}__gte': changed_at})
+    return Q(**{f'{field}__gt': changed_at}) | Q(**{field: changed_at, 'pk__gt': pk})
+
+
+def oldest_open_write(alias):
+    sql = OLDEST_OPEN_WRITE_QUERY.get(connections[alias].vendor)
+    if sql is None:
+        return None
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+
+def settled_until(alias):
+    """
+    Newest change time the feed can report without a later commit landing
+    behind it.
+
+    Rows carry the time they were written, not committed, so a transaction
+    still open may yet commit changes older than ones already reported. On
+    PostgreSQL the feed stops before the start of the oldest open write
+    transaction, however long it runs; ``CHANGE_FEED_SETTLE_SECONDS`` more
+    absorbs clock skew between the app servers and the database. Elsewhere
+    only the settle delay applies, so every write transaction must commit
+    within that many seconds.
+    """
+    settle = timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    until = timezone.now() - settle
+    oldest = oldest_open_write(alias)
+    if oldest is not None:
+        until = min(until, oldest - settle)
+    return until
+
+
+def change_feed(request, queryset, serializer_class, resource, owner_id=None, removed=None):
+    """
+    Return the changes to ``queryset`` after the ``since`` cursor.
+
+    Live rows are read in ``(updated_at, id)`` order and merged with the
+    resource's tombstones in ``(deleted_at, id)`` order, so a client that
+    keeps passing back ``next_since`` sees every change once, in O(changes).
+    Rows matching ``removed`` (e.g. soft-deleted mappings) are reported as
+    deletes. Changes after ``settled_until`` are held back so transactions
+    still in flight cannot commit behind the cursor.
+    """
+    try:
+        limit = int(request.query_params.get('limit', settings.CHANGE_FEED_PAGE_SIZE))
+    except ValueError:
+        limit = settings.CHANGE_FEED_PAGE_SIZE
+    limit = max(1, min(limit, settings.CHANGE_FEED_MAX_PAGE_SIZE))
+
+    since = request.query_params.get('since')
+    try:
+        cursor = decode_cursor(since) if since else None
+    except (ValueError, TypeError):
+        return Response({
+            'error': 'Invalid since cursor'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    until = settled_until(queryset.db)
+    rows = queryset.filter(updated_at__lte=until).order_by('updated_at', 'pk')
+    tombstones = Tombstone.objects.filter(resource=resource, deleted_at__lte=until).order_by('deleted_at', 'pk')
+    if owner_id is not None:
+        tombstones = tombstones.filter(owner_id=owner_id)
+    if cursor is not None:
+        rows = rows.filter(after('updated_at', cursor, ROW_RANK))
+        tombstones = tombstones.filter(after('deleted_at', cursor, TOMBSTONE_RANK))
+
+    rows = list(rows[:limit + 1])
+    removed_ids = set()
+    if removed is not None and rows:
+        removed_ids = set(queryset.filter(removed, pk__in=[row.pk for row in rows]).values_list('pk', flat=True))
+    tombstones = list(tombstones[:limit + 1])
+
+    merged = list(heapq.merge(
+        ((row.updated_at, ROW_RANK, row.pk, row) for row in rows),
+        ((tombstone.deleted_at, TOMBSTONE_RANK, tombstone.pk, tombstone) for tombstone in tombstones),
+        key=lambda entry: entry[:3],
+    ))
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    upserts = [entry[3] for entry in merged if entry[1] == ROW_RANK and entry[3].pk not in removed_ids]
+    serialized = {item['id']: item for item in serializer_class(upserts, many=True).data}
+
+    changes = []
+    for changed_at, rank, pk, entry in merged:
+        if rank == TOMBSTONE_RANK:
+            changes.append({'op': 'delete', 'id': entry.object_id, 'changed_at': changed_at})
+        elif pk in removed_ids:
+            changes.append({'op': 'delete', 'id': pk, 'changed_at': changed_at})
+        else:
+            changes.append({'op': 'upsert', 'id': pk, 'changed_at': changed_at, 'data': serialized[pk]})
+
+    next_since = encode_cursor(*merged[-1][:3]) if merged else since
+    return Response({
+        'count': len(changes),
+        'has_more': has_more,
+        'next_since': next_since,
+        'changes': changes
+    }, status=status.HTTP_200_OK)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import resource
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from changes.broker import broker
+from changes.views import stream_events
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def max_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = "Measure how many concurrent SSE subscribers one worker can fan events out to"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscribers', type=int, nargs='+', default=[100, 1000, 5000],
+            help='Concurrent subscriber counts to benchmark',
+        )
+        parser.add_argument('--events', type=int, default=50, help='Events published per run')
+        parser.add_argument('--owners', type=int, default=1, help='Spread subscribers across this many owners')
+        parser.add_argument('--interval', type=float, default=0.01, help='Seconds between published events')
+
+    def handle(self, *args, **options):
+        if options['events'] <= 0 or options['owners'] <= 0:
+            raise CommandError('--events and --owners must be positive')
+
+        self.stdout.write(f"{'subscribers':>11} {'subscribe':>10} {'p50':>9} {'p99':>9} {'max':>9} {'dropped':>8} {'rss':>8}")
+        for count in options['subscribers']:
+            result = asyncio.run(self.run(count, options['events'], options['owners'], options['interval']))
+            self.stdout.write(
+                f"{count:>11} {result['subscribe']:>9.3f}s "
+                f"{result['p50'] * 1000:>7.2f}ms {result['p99'] * 1000:>7.2f}ms {result['max'] * 1000:>7.2f}ms "
+                f"{result['dropped']:>8} {max_rss_mb():>6.0f}MB"
+            )
+
+    async def run(self, count, events, owners, interval):
+        """
+        Open ``count`` event streams, publish ``events`` events to every owner
+        from a separate thread (as a request thread would) and record how long
+        each rendered SSE frame took to reach its subscriber.
+        """
+        dropped_before = broker.dropped
+        started = time.perf_counter()
+        streams = [stream_events(index % owners) for index in range(count)]
+        for stream in streams:
+            await anext(stream)  # retry: preamble; the stream is subscribed from here on
+        subscribe_time = time.perf_counter() - started
+
+        sent = {}
+        latencies = []
+
+        async def consume(stream):
+            received = 0
+            while received < events:
+                frame = await anext(stream)
+                if not frame.startswith('id:'):
+                    continue
+                data = json.loads(frame.rsplit('data: ', 1)[1])
+                if data.get('type') != 'bench':
+                    continue
+                latencies.append(time.perf_counter() - sent[data['seq']])
+                received += 1
+
+        def publish():
+            for seq in range(events):
+                sent[seq] = time.perf_counter()
+                for owner in range(owners):
+                    broker.dispatch(owner, {'type': 'bench', 'seq': seq})
+                time.sleep(interval)
+
+        consumers = [asyncio.create_task(consume(stream)) for stream in streams]
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        try:
+            await asyncio.wait_for(asyncio.gather(*consumers), timeout=events * interval + 60)
+        finally:
+            publisher.join()
+            for task in consumers:
+                task.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            for stream in streams:
+                await stream.aclose()
+
+        return {
+            'subscribe': subscribe_time,
+            'p50': statistics.median(latencies),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies),
+            'dropped': broker.dropped - dropped_before,
+        }
@@ -0,0 +1,25 @@
+from django.db import models
+
+class Tombstone(models.Model):
+    """Record of a hard-deleted row, so change feeds can report deletes"""
+    RESOURCE_CHOICES = [
+        ('patient', 'Patient'),
+        ('doctor', 'Doctor'),
+        ('mapping', 'Patient-doctor mapping'),
+    ]
+
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField()
+    # Plain column rather than a foreign key: tombstones are written while
+    # the owning user may itself be in the middle of being deleted.
+    owner_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['resource', 'owner_id', 'deleted_at', 'id'], name='tombstone_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} #{self.object_id} deleted at {self.deleted_at}"
\ No newline at end of file
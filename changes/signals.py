@@ -0,0 +1,93 @@
+import weakref
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+from .broker import broker
+from .models import Tombstone
+
+
+class MappingOwners:
+    """
+    Owners of the patients behind the mappings removed by one delete call.
+
+    Looked up with a single query on the first ``post_delete`` rather than
+    once per mapping; the patients still exist then, as mappings are deleted
+    before their patient when a delete cascades.
+    """
+
+    def __init__(self):
+        self.patient_ids = set()
+        self.owners = None
+
+    def get(self, patient_id):
+        if self.owners is None:
+            self.owners = dict(
+                Patient.objects.filter(pk__in=self.patient_ids).values_list('pk', 'created_by_id')
+            )
+        return self.owners.get(patient_id)
+
+
+# Keyed by the object or queryset whose delete() removes the mappings
+mapping_deletes = weakref.WeakKeyDictionary()
+
+
+@receiver(post_delete, sender=Patient)
+def record_patient_delete(sender, instance, **kwargs):
+    Tombstone.objects.create(resource='patient', object_id=instance.pk, owner_id=instance.created_by_id)
+
+
+@receiver(post_delete, sender=Doctor)
+def record_doctor_delete(sender, instance, **kwargs):
+    Tombstone.objects.create(resource='doctor', object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=PatientDoctorMapping)
+def collect_mapping_delete(sender, instance, origin=None, **kwargs):
+    if origin is not None and not PatientDoctorMapping.patient.is_cached(instance):
+        mapping_deletes.setdefault(origin, MappingOwners()).patient_ids.add(instance.patient_id)
+
+
+@receiver(post_delete, sender=PatientDoctorMapping)
+def record_mapping_delete(sender, instance, origin=None, **kwargs):
+    if PatientDoctorMapping.patient.is_cached(instance):
+        owner_id = instance.patient.created_by_id
+    elif isinstance(origin, Patient) and origin.pk == instance.patient_id:
+        owner_id = origin.created_by_id
+    elif origin in mapping_deletes:
+        owner_id = mapping_deletes[origin].get(instance.patient_id)
+    else:
+        owner_id = Patient.objects.filter(pk=instance.patient_id).values_list('created_by_id', flat=True).first()
+    Tombstone.objects.create(resource='mapping', object_id=instance.pk, owner_id=owner_id)
+
+
+@receiver(post_save, sender=PatientDoctorMapping)
+def publish_mapping_change(sender, instance, created, **kwargs):
+    if created:
+        event_type = 'mapping.created'
+    elif not instance.is_active:
+        event_type = 'mapping.removed'
+    else:
+        return
+    transaction.on_commit(partial(broker.publish, instance.patient.created_by_id, {
+        'type': event_type,
+        'id': instance.pk,
+        'patient': instance.patient_id,
+        'doctor': instance.doctor_id,
+        'at': instance.updated_at,
+    }))
+
+
+@receiver(post_save, sender=Patient)
+def publish_patient_change(sender, instance, created, **kwargs):
+    if created:
+        return
+    transaction.on_commit(partial(broker.publish, instance.created_by_id, {
+        'type': 'patient.updated',
+        'id': instance.pk,
+        'at': instance.updated_at,
+    }))
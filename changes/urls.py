@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.event_stream, name='event-stream'),
+]
\ No newline at end of file
@@ -0,0 +1,50 @@
+import asyncio
+import itertools
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from healthcare_backend.asyncviews import authenticate, exception_response, render_response
+from .broker import broker
+
+
+def format_event(event_id, event_type, payload):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
+
+
+async def stream_events(owner_id):
+    subscriber = broker.subscribe(owner_id)
+    queue = subscriber[1]
+    counter = itertools.count(1)
+    try:
+        yield f'retry: {settings.SSE_RETRY_MILLISECONDS}\n\n'
+        while True:
+            try:
+                # asyncio.timeout avoids the extra task wait_for() creates per event
+                async with asyncio.timeout(settings.SSE_KEEPALIVE_SECONDS):
+                    event_type, payload = await queue.get()
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if getattr(queue, 'overflowed', False):
+                queue.overflowed = False
+                yield format_event(next(counter), 'resync', json.dumps({'reason': 'events dropped, refetch state'}))
+            yield format_event(next(counter), event_type, payload)
+    finally:
+        broker.unsubscribe(owner_id, subscriber)
+
+
+@require_GET
+async def event_stream(request):
+    """Server-Sent Events stream of mapping and patient changes for the authenticated user"""
+    try:
+        user = await authenticate(request, allow_query_token=True)
+    except APIException as exc:
+        return render_response(exception_response(exc))
+
+    response = StreamingHttpResponse(stream_events(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
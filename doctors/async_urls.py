@@ -0,0 +1,7 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.doctor_list, name='async-doctor-list'),
+    path('<int:pk>/', async_views.doctor_detail, name='async-doctor-detail'),
+]
@@ -0,0 +1,72 @@
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import status
+from rest_framework.decorators import throttle_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from .cache import doctor_cache
+from .models import Doctor
+from .serializers import DoctorSerializer
+from .views import DoctorPagination, DoctorViewSet
+from healthcare_backend.asyncviews import async_api_view
+from healthcare_backend.conditional import instance_etag
+from healthcare_backend.readserializers import values_serializer
+
+@async_api_view
+@throttle_classes(DoctorViewSet.throttle_classes)
+async def doctor_list(request):
+    """Get all doctors"""
+    reader = values_serializer(DoctorSerializer)
+    rows = reader.values(Doctor.objects.all())
+    paginator = DoctorPagination()
+    try:
+        page = await paginator.apaginate_queryset(rows, request)
+    except ParseError as e:
+        return Response({
+            'error': str(e.detail)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if page is not None:
+        return paginator.get_paginated_response(reader.serialize(page))
+    
+    cached = doctor_cache.serves(request)
+    version = await doctor_cache.aget_version() if cached else None
+    entry = await doctor_cache.aget('list', version) if cached else None
+    if entry is not None:
+        return doctor_cache.response(request, entry, hit=True)
+    
+    if cached:
+        # The entry outlives any replica lag; fill it from the primary
+        rows = reader.values(Doctor.objects.using(DEFAULT_DB_ALIAS))
+    data = reader.serialize([row async for row in rows.aiterator()])
+    payload = {
+        'count': len(data),
+        'doctors': data
+    }
+    if not cached:
+        return Response(payload, status=status.HTTP_200_OK)
+    entry = await doctor_cache.aset('list', payload, version=version)
+    return doctor_cache.response(request, entry, hit=False)
+
+@async_api_view
+@throttle_classes(DoctorViewSet.throttle_classes)
+async def doctor_detail(request, pk):
+    """Get details of a specific doctor"""
+    cached = doctor_cache.serves(request)
+    version = await doctor_cache.aget_version() if cached else None
+    entry = await doctor_cache.aget(f'detail:{pk}', version) if cached else None
+    if entry is not None:
+        return doctor_cache.response(request, entry, hit=True)
+    
+    queryset = Doctor.objects.using(DEFAULT_DB_ALIAS) if cached else Doctor.objects.all()
+    doctor = await queryset.filter(pk=pk).afirst()
+    if not doctor:
+        return Response({
+            'error': 'Doctor not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    payload = {
+        'doctor': DoctorSerializer(doctor).data
+    }
+    if not cached:
+        return Response(payload, status=status.HTTP_200_OK)
+    entry = await doctor_cache.aset(f'detail:{pk}', payload, etag=instance_etag(doctor), last_modified=doctor.updated_at, version=version)
+    return doctor_cache.response(request, entry, hit=False)
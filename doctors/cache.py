@@ -0,0 +1,114 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from healthcare_backend.conditional import check_preconditions, make_etag, set_validators
+from healthcare_backend.renderers import FastJSONRenderer
+
+
+class DoctorCache:
+    """
+    Versioned cache of pre-rendered doctor directory and detail payloads.
+
+    Entries are stored as JSON bytes, together with their ETag and
+    Last-Modified validators, under keys that embed a version number.
+    Invalidation bumps the version instead of deleting keys, so every entry
+    written before a change becomes unreachable at once and simply expires.
+    Hit/miss counters are kept per process.
+    """
+    version_key = 'doctors:version'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def cache(self):
+        return caches[settings.DOCTOR_CACHE_ALIAS]
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # Seed from the clock so a lost version key never revives old entries
+            self.cache.add(self.version_key, int(time.time() * 1000), None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def make_key(self, name, version=None):
+        return f'doctors:v{version or self.get_version()}:{name}'
+
+    def get(self, name, version=None):
+        entry = self.cache.get(self.make_key(name, version))
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, name, data, etag=None, last_modified=None, version=None):
+        """
+        Render ``data`` and store it with its validators; list entries default
+        to a version-based ETag. Pass the ``version`` read before querying, so
+        a fill that races an invalidation lands under the version it read.
+        """
+        key = self.make_key(name, version)
+        entry = {
+            'body': FastJSONRenderer().render(data),
+            'etag': etag or make_etag(key),
+            'last_modified': last_modified,
+        }
+        self.cache.set(key, entry, settings.DOCTOR_CACHE_TIMEOUT)
+        return entry
+
+    async def aget_version(self):
+        return await sync_to_async(self.get_version)()
+
+    async def aget(self, name, version=None):
+        return await sync_to_async(self.get)(name, version)
+
+    async def aset(self, name, data, etag=None, last_modified=None, version=None):
+        return await sync_to_async(self.set)(name, data, etag=etag, last_modified=last_modified, version=version)
+
+    def invalidate(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.get_version()
+            self.cache.incr(self.version_key)
+        with self.lock:
+            self.invalidations += 1
+
+    def serves(self, request):
+        """Whether cached JSON can answer ``request``; clients that negotiated another format bypass the cache"""
+        renderer = getattr(request, 'accepted_renderer', None)
+        return renderer is None or renderer.media_type == FastJSONRenderer.media_type
+
+    def response(self, request, entry, hit):
+        """Serve a cached entry, answering conditional requests without touching the body"""
+        response = check_preconditions(request, etag=entry['etag'], last_modified=entry['last_modified'])
+        if response is None:
+            response = HttpResponse(entry['body'], content_type=FastJSONRenderer.media_type)
+            set_validators(response, etag=entry['etag'], last_modified=entry['last_modified'])
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+                'version': self.cache.get(self.version_key),
+                'backend': settings.CACHES[settings.DOCTOR_CACHE_ALIAS]['BACKEND'],
+            }
+
+
+doctor_cache = DoctorCache()
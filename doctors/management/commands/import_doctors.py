@@ -0,0 +1,17 @@
+from django.db import transaction
+from healthcare_backend.importing import StreamingImportCommand
+from doctors.cache import doctor_cache
+from doctors.serializers import DoctorSerializer
+
+
+class Command(StreamingImportCommand):
+    help = "Stream doctors from a CSV or NDJSON file into the database"
+    serializer_class = DoctorSerializer
+    label = 'doctors'
+
+    def import_chunk(self, chunk, offset, extra_values):
+        inserted, rejects = super().import_chunk(chunk, offset, extra_values)
+        if inserted:
+            # Rows are written with COPY/bulk_create, which send no post_save
+            transaction.on_commit(doctor_cache.invalidate)
+        return inserted, rejects
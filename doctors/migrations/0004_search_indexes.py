@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """AddIndex that only touches PostgreSQL databases; other backends search in process"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def create_trigram_extension(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_extension, migrations.RunPython.noop),
+        AddPostgresIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector(models.Case(models.When(specialty='cardiology', then=models.Value('Cardiology')), models.When(specialty='dermatology', then=models.Value('Dermatology')), models.When(specialty='endocrinology', then=models.Value('Endocrinology')), models.When(specialty='gastroenterology', then=models.Value('Gastroenterology')), models.When(specialty='neurology', then=models.Value('Neurology')), models.When(specialty='oncology', then=models.Value('Oncology')), models.When(specialty='orthopedics', then=models.Value('Orthopedics')), models.When(specialty='pediatrics', then=models.Value('Pediatrics')), models.When(specialty='psychiatry', then=models.Value('Psychiatry')), models.When(specialty='radiology', then=models.Value('Radiology')), models.When(specialty='general', then=models.Value('General Practice')), default=models.F('specialty'), output_field=models.CharField()), config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), '||', django.contrib.postgres.search.SearchVector('hospital_affiliation', config='simple', weight='C'), django.contrib.postgres.search.SearchConfig('simple')), name='doctor_search_idx'),
+        ),
+        AddPostgresIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='doctor_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddPostgresIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['hospital_affiliation'], name='doctor_hospital_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
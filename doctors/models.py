@@ -1,19 +1,38 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 
+SPECIALTY_CHOICES = [
+    ('cardiology', 'Cardiology'),
+    ('dermatology', 'Dermatology'),
+    ('endocrinology', 'Endocrinology'),
+    ('gastroenterology', 'Gastroenterology'),
+    ('neurology', 'Neurology'),
+    ('oncology', 'Oncology'),
+    ('orthopedics', 'Orthopedics'),
+    ('pediatrics', 'Pediatrics'),
+    ('psychiatry', 'Psychiatry'),
+    ('radiology', 'Radiology'),
+    ('general', 'General Practice'),
+]
+
+
+def search_document():
+    """PostgreSQL tsvector over name, specialty label and hospital; ``doctor_search_idx`` indexes this exact expression"""
+    specialty = models.Case(
+        *[models.When(specialty=value, then=models.Value(label)) for value, label in SPECIALTY_CHOICES],
+        default=models.F('specialty'),
+        output_field=models.CharField(),
+    )
+    return (
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector(specialty, weight='B', config='simple')
+        + SearchVector('hospital_affiliation', weight='C', config='simple')
+    )
+
+
 class Doctor(models.Model):
-    SPECIALTY_CHOICES = [
-        ('cardiology', 'Cardiology'),
-        ('dermatology', 'Dermatology'),
-        ('endocrinology', 'Endocrinology'),
-        ('gastroenterology', 'Gastroenterology'),
-        ('neurology', 'Neurology'),
-        ('oncology', 'Oncology'),
-        ('orthopedics', 'Orthopedics'),
-        ('pediatrics', 'Pediatrics'),
-        ('psychiatry', 'Psychiatry'),
-        ('radiology', 'Radiology'),
-        ('general', 'General Practice'),
-    ]
+    SPECIALTY_CHOICES = SPECIALTY_CHOICES
     
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
@@ -27,6 +46,14 @@ class Doctor(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='doctor_name_idx'),
+            models.Index(fields=['updated_at', 'id'], name='doctor_updated_idx'),
+            # PostgreSQL only (see migration 0004): full-text and typo-tolerant search
+            GinIndex(search_document(), name='doctor_search_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='doctor_name_trgm_idx'),
+            GinIndex(fields=['hospital_affiliation'], opclasses=['gin_trgm_ops'], name='doctor_hospital_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.name} - {self.specialty}"
\ No newline at end of file
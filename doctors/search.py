@@ -0,0 +1,199 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from .cache import doctor_cache
+from .models import SPECIALTY_CHOICES, Doctor, search_document
+from .serializers import DoctorSerializer
+
+WORD = re.compile(r'\w+')
+
+# Same default as pg_trgm's similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+# Field weights; specialty is matched on both its value and its display label
+FIELD_WEIGHTS = (('name', 1.0), ('specialty', 0.8), ('hospital_affiliation', 0.6))
+
+SPECIALTY_LABELS = dict(SPECIALTY_CHOICES)
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+def trigrams(word):
+    """Trigrams of a word padded like pg_trgm does"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    return len(a & b) / len(a | b)
+
+
+class DoctorSearchIndex:
+    """
+    In-process search over doctor name, specialty and hospital.
+
+    The index maps every distinct word to the doctors containing it (with
+    the weight of the best field it appears in), keeps the vocabulary sorted
+    for prefix matches and keeps trigram postings for typo-tolerant matches.
+    Each query term must match a word exactly, as a prefix or with trigram
+    similarity of at least ``SIMILARITY_THRESHOLD``; doctors are ranked by
+    the summed, field-weighted match scores. Serialized doctors are stored
+    alongside, so a search never touches the database.
+
+    The index is tied to the doctor cache version, which ``Doctor`` saves,
+    deletes, bulk creates and imports bump once they commit; the next search
+    after a change rebuilds it from one query on the primary (a replica may
+    not have the change yet), in every worker. The version is read before
+    the rebuild, so one that races a commit is redone by the next search.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.snapshot = self.build([])
+        self.rebuilds = 0
+
+    def ensure_current(self):
+        version = doctor_cache.get_version()
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                # Swapped in one assignment, so searches never see a half-built index
+                self.snapshot = self.build(Doctor.objects.using(DEFAULT_DB_ALIAS))
+                self.version = version
+                self.rebuilds += 1
+
+    def build(self, queryset):
+        payloads, names = {}, {}
+        postings = defaultdict(dict)
+        for doctor in queryset:
+            payloads[doctor.pk] = DoctorSerializer(doctor).data
+            names[doctor.pk] = doctor.name.lower()
+            for field, weight in FIELD_WEIGHTS:
+                text = getattr(doctor, field)
+                if field == 'specialty':
+                    text = f'{text} {SPECIALTY_LABELS.get(text, "")}'
+                for word in words(text):
+                    postings[word][doctor.pk] = max(weight, postings[word].get(doctor.pk, 0))
+
+        word_trigrams = {word: trigrams(word) for word in postings}
+        trigram_words = defaultdict(set)
+        for word, grams in word_trigrams.items():
+            for gram in grams:
+                trigram_words[gram].add(word)
+
+        return {
+            'payloads': payloads,
+            'names': names,
+            'postings': dict(postings),
+            'vocabulary': sorted(postings),
+            'word_trigrams': word_trigrams,
+            'trigram_words': dict(trigram_words),
+        }
+
+    def term_scores(self, snapshot, term):
+        """Best match score per doctor for one query term"""
+        vocabulary = snapshot['vocabulary']
+        matches = {}
+        start = bisect.bisect_left(vocabulary, term)
+        for word in vocabulary[start:]:
+            if not word.startswith(term):
+                break
+            matches[word] = 1.0 if word == term else 0.9
+
+        grams = trigrams(term)
+        candidates = set()
+        for gram in grams:
+            candidates |= snapshot['trigram_words'].get(gram, set())
+        for word in candidates - matches.keys():
+            score = similarity(grams, snapshot['word_trigrams'][word])
+            if score >= SIMILARITY_THRESHOLD:
+                matches[word] = score * 0.8
+
+        scores = {}
+        for word, score in matches.items():
+            for doctor_id, weight in snapshot['postings'][word].items():
+                scores[doctor_id] = max(score * weight, scores.get(doctor_id, 0))
+        return scores
+
+    def search(self, query, limit):
+        self.ensure_current()
+        terms = words(query)
+        if not terms:
+            return []
+        snapshot = self.snapshot
+        ranks = None
+        for term in terms:
+            scores = self.term_scores(snapshot, term)
+            if ranks is None:
+                ranks = scores
+            else:
+                ranks = {doctor_id: rank + scores[doctor_id] for doctor_id, rank in ranks.items() if doctor_id in scores}
+            if not ranks:
+                return []
+        names = snapshot['names']
+        ranked = sorted(ranks, key=lambda doctor_id: (-ranks[doctor_id], names[doctor_id], doctor_id))
+        return [snapshot['payloads'][doctor_id] for doctor_id in ranked[:limit]]
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            'doctors': len(snapshot['payloads']),
+            'words': len(snapshot['vocabulary']),
+            'version': self.version,
+            'rebuilds': self.rebuilds,
+        }
+
+
+doctor_search_index = DoctorSearchIndex()
+
+
+def search_database(queryset, query, limit):
+    """
+    Search in the database: full-text plus trigram word similarity on
+    PostgreSQL (served by the GIN indexes on ``Doctor``), ``icontains`` on
+    every term elsewhere.
+    """
+    terms = words(query)
+    if not terms:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'postgresql':
+        for term in terms:
+            labels = [value for value, label in SPECIALTY_CHOICES if term in label.lower()]
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(specialty__icontains=term) | Q(specialty__in=labels)
+                | Q(hospital_affiliation__icontains=term)
+            )
+        return queryset.order_by('name', 'id')[:limit]
+
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+    from django.db.models.functions import Greatest
+
+    # Every term as a prefix, so partial words match through the tsvector index
+    tsquery = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple')
+    return (
+        queryset.annotate(
+            document=search_document(),
+            rank=SearchRank(search_document(), tsquery) + Greatest(
+                TrigramWordSimilarity(query, 'name'), TrigramWordSimilarity(query, 'hospital_affiliation')
+            ),
+        )
+        .filter(Q(document=tsquery) | Q(name__trigram_word_similar=query) | Q(hospital_affiliation__trigram_word_similar=query))
+        .order_by('-rank', 'name', 'id')[:limit]
+    )
+
+
+def search_doctors(query, limit, queryset=None):
+    """Serialized doctors matching ``query``, best first, from ``DOCTOR_SEARCH_BACKEND``"""
+    if settings.DOCTOR_SEARCH_BACKEND == 'database':
+        queryset = Doctor.objects.all() if queryset is None else queryset
+        return DoctorSerializer(search_database(queryset, query, limit), many=True).data
+    return doctor_search_index.search(query, limit)
@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import doctor_cache
+from .models import Doctor
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_cache(sender, using, **kwargs):
+    # Bumped only once the change is visible, or a read during the write would cache the old row as current
+    transaction.on_commit(doctor_cache.invalidate, using=using)
@@ -1,3 +1,259 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from authentication.tests import OwnerTestCase, make_owner
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.renderers import FastJSONRenderer, MessagePackParser, MessagePackRenderer, msgpack
+from patients.tests import SEPARATE_REPLICAS
+from .cache import doctor_cache
+from .models import Doctor
+from .search import doctor_search_index
+from .serializers import DoctorSerializer
+from .views import DoctorViewSet
+
+
+def make_doctors(count, start=0):
+    return [
+        Doctor.objects.create(
+            name=f'Doctor {i}',
+            email=f'doctor{i}@example.com',
+            phone='5550100',
+            specialty='cardiology',
+            license_number=f'LIC-{i}',
+            years_of_experience=10,
+            hospital_affiliation='General Hospital',
+        )
+        for i in range(start, start + count)
+    ]
+
+
+class DoctorQueryCountTests(OwnerTestCase):
+    """Query counts for doctor endpoints must not grow with the row count"""
+
+    def assert_list_queries(self, url, expected):
+        make_doctors(1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_doctors(20, start=1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_list(self):
+        self.assert_list_queries('/api/doctors/', 1)
+
+    def test_list_paginated(self):
+        self.assert_list_queries('/api/doctors/?page_size=10', 2)
+
+    def test_list_paginated_without_count(self):
+        self.assert_list_queries('/api/doctors/?page_size=10&count=none', 1)
+
+    def test_retrieve(self):
+        doctor = make_doctors(1)[0]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(f'/api/doctors/{doctor.id}/').status_code, 200)
+
+
+class DoctorCacheTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.doctor = make_doctors(1)[0]
+
+    def test_repeat_reads_are_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/doctors/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/doctors/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_save_invalidates_cached_detail(self):
+        url = f'/api/doctors/{self.doctor.id}/'
+        self.client.get(url)
+        self.doctor.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['doctor']['name'], 'Renamed')
+
+    def test_read_during_open_write_is_not_cached_as_current(self):
+        url = f'/api/doctors/{self.doctor.id}/'
+        version = doctor_cache.get_version()
+        stale = self.client.get(url).json()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(url, {'name': 'Renamed'}, format='json')
+            self.assertEqual(doctor_cache.get_version(), version)
+            # A concurrent reader still sees the committed row and caches it
+            doctor_cache.set(f'detail:{self.doctor.id}', stale, version=doctor_cache.get_version())
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['doctor']['name'], 'Renamed')
+
+    def test_fill_racing_a_commit_lands_under_the_version_it_read(self):
+        url = f'/api/doctors/{self.doctor.id}/'
+        version = doctor_cache.get_version()
+        stale = self.client.get(url).json()
+        self.doctor.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor.save()
+        doctor_cache.set(f'detail:{self.doctor.id}', stale, version=version)
+
+        self.assertEqual(self.client.get(url).json()['doctor']['name'], 'Renamed')
+
+
+class DoctorSearchTests(OwnerTestCase):
+    """Doctor search ranks name, specialty and hospital matches and tolerates typos"""
+
+    def setUp(self):
+        super().setUp()
+        rows = [
+            ('John Carter', 'cardiology', 'Mercy Hospital'),
+            ('Alice Johnson', 'neurology', 'Carter Clinic'),
+            ('Maria Lopez', 'general', 'St. Luke Medical Center'),
+        ]
+        for i, (name, specialty, hospital) in enumerate(rows):
+            Doctor.objects.create(
+                name=name, email=f'search{i}@example.com', phone='5550100', specialty=specialty,
+                license_number=f'SEARCH-{i}', years_of_experience=5, hospital_affiliation=hospital,
+            )
+
+    def search(self, query):
+        response = self.client.get('/api/doctors/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [doctor['name'] for doctor in response.json()['doctors']]
+
+    def test_name_matches_rank_above_hospital_matches(self):
+        self.assertEqual(self.search('carter'), ['John Carter', 'Alice Johnson'])
+
+    def test_prefixes_typos_and_specialty_labels(self):
+        self.assertEqual(self.search('john'), ['John Carter', 'Alice Johnson'])
+        self.assertEqual(self.search('lop'), ['Maria Lopez'])
+        self.assertEqual(self.search('cardiolgy'), ['John Carter'])
+        self.assertEqual(self.search('general practice'), ['Maria Lopez'])
+        self.assertEqual(self.search('neurology carter'), ['Alice Johnson'])
+
+    def test_index_serves_searches_without_queries_until_a_doctor_changes(self):
+        self.search('lopez')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search('lopez'), ['Maria Lopez'])
+
+        doctor = Doctor.objects.get(name='Maria Lopez')
+        doctor.name = 'Maria Lopes'
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor.save()
+        self.assertEqual(self.search('lopes'), ['Maria Lopes'])
+
+    def test_search_during_open_write_does_not_pin_a_stale_index(self):
+        self.search('lopez')
+        doctor = Doctor.objects.get(name='Maria Lopez')
+        doctor.name = 'Maria Garcia'
+        rebuilds = doctor_search_index.rebuilds
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor.save()
+            # Concurrent readers keep the committed index until the write lands
+            self.assertEqual(self.search('lopez'), ['Maria Lopez'])
+            self.assertEqual(doctor_search_index.rebuilds, rebuilds)
+
+        self.assertEqual(self.search('garcia'), ['Maria Garcia'])
+        self.assertEqual(self.search('lopez'), [])
+        self.assertEqual(doctor_search_index.rebuilds, rebuilds + 1)
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get('/api/doctors/search/').status_code, 400)
+
+
+class DoctorValuesSerializerTests(TestCase):
+    """values()-based list serialization must match DoctorSerializer exactly"""
+
+    def test_matches_model_serializer(self):
+        make_doctors(3)
+        Doctor.objects.filter(name='Doctor 1').update(specialty='pediatrics', years_of_experience=0)
+        queryset = Doctor.objects.order_by('pk')
+        reader = values_serializer(DoctorSerializer)
+        self.assertEqual(
+            json.dumps(reader.serialize(reader.values(queryset))), json.dumps(DoctorSerializer(queryset, many=True).data)
+        )
+
+
+class DoctorRenderingTests(OwnerTestCase):
+    """The fast JSON renderer matches DRF's bytes; MessagePack is negotiated with Accept and Content-Type"""
+
+    def setUp(self):
+        super().setUp()
+        make_doctors(2)
+
+    def test_fast_json_matches_drf(self):
+        data = {
+            'at': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'fee': Decimal('12.50'),
+            'note': 'Caf\u00e9\u2028line',
+            7: [None, True, 2 ** 70],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'), JSONRenderer().render(data, 'application/json; indent=2')
+        )
+
+    @skipUnless(msgpack, 'requires msgpack')
+    def test_msgpack_round_trip_bypasses_json_cache(self):
+        expected = self.client.get('/api/doctors/').json()
+        with mock.patch.object(DoctorViewSet, 'renderer_classes', [FastJSONRenderer, MessagePackRenderer]), \
+                mock.patch.object(DoctorViewSet, 'parser_classes', [MessagePackParser]):
+            response = self.client.get('/api/doctors/', HTTP_ACCEPT='application/msgpack')
+            self.assertEqual(response['Content-Type'], 'application/msgpack')
+            self.assertNotIn('X-Cache', response)
+            self.assertEqual(msgpack.unpackb(response.content), expected)
+
+            body = msgpack.packb({
+                'name': 'Packed', 'email': 'packed@example.com', 'phone': '5550100', 'specialty': 'cardiology',
+                'license_number': 'LIC-P', 'years_of_experience': 3, 'hospital_affiliation': 'General Hospital',
+            })
+            response = self.client.post(
+                '/api/doctors/', body, content_type='application/msgpack', HTTP_ACCEPT='application/msgpack'
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(msgpack.unpackb(response.content)['doctor']['name'], 'Packed')
+
+
+@skipUnless(SEPARATE_REPLICAS, 'requires a replica configured as a separate database')
+class DoctorReplicaCacheTests(TransactionTestCase):
+    """Shared cache entries and the search index are filled from the primary, never a lagging replica"""
+    databases = {'default', *SEPARATE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_owner()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Written to the primary only, as if the replica had not caught up yet
+        self.doctors = make_doctors(2)
+
+    def test_cache_fills_read_primary(self):
+        response = self.client.get('/api/doctors/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 2)
+        response = self.client.get(f'/api/doctors/{self.doctors[0].id}/')
+        self.assertEqual(response.status_code, 200)
+
+        # Pages are not cached and keep reading the replica
+        self.assertEqual(self.client.get('/api/doctors/?page_size=1').json()['doctors'], [])
+
+    async def test_async_cache_fills_read_primary(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        response = await self.async_client.get('/api/async/doctors/', headers=headers)
+        self.assertEqual(response.json()['count'], 2)
+        response = await self.async_client.get(f'/api/async/doctors/{self.doctors[0].id}/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_index_reads_primary(self):
+        response = self.client.get('/api/doctors/search/', {'q': 'doctor'})
+        self.assertEqual(len(response.json()['doctors']), 2)
@@ -1,13 +1,32 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from .cache import doctor_cache
 from .models import Doctor
+from .search import search_doctors
 from .serializers import DoctorSerializer
+from healthcare_backend.conditional import check_preconditions, instance_etag, is_conditional, set_validators
+from healthcare_backend.bulk import BulkCreateError, bulk_create_records
+from healthcare_backend.pagination import KeysetPagination
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.routers import ReplicaReadMixin
+from healthcare_backend.throttling import UserTokenBucketThrottle, UserWriteTokenBucketThrottle, scoped
+from changes.feed import change_feed
 
-class DoctorViewSet(viewsets.ModelViewSet):
+class DoctorPagination(KeysetPagination):
+    ordering = 'name'
+    results_key = 'doctors'
+
+class DoctorViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Doctor.objects.all()
     serializer_class = DoctorSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = scoped('doctors', UserTokenBucketThrottle, UserWriteTokenBucketThrottle)
+    pagination_class = DoctorPagination
     
     def create(self, request):
         """Create a new doctor"""
@@ -15,10 +34,11 @@ class DoctorViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 doctor = serializer.save()
-                return Response({
-                    'message': 'Doctor created successfully',
-                    'doctor': serializer.data
-                }, status=status.HTTP_201_CREATED)
+                if doctor is not None:
+                    return Response({
+                        'message': 'Doctor created successfully',
+                        'doctor': serializer.data
+                    }, status=status.HTTP_201_CREATED)
             
             return Response({
                 'error': 'Doctor creation failed',
@@ -34,13 +54,35 @@ class DoctorViewSet(viewsets.ModelViewSet):
     def list(self, request):
         """Get all doctors"""
         try:
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
+            reader = values_serializer(DoctorSerializer)
+            rows = reader.values(self.get_queryset())
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(reader.serialize(page))
+            
+            cached = doctor_cache.serves(request)
+            version = doctor_cache.get_version() if cached else None
+            entry = doctor_cache.get('list', version) if cached else None
+            if entry is not None:
+                return doctor_cache.response(request, entry, hit=True)
             
+            if cached:
+                # The entry outlives any replica lag; fill it from the primary
+                rows = reader.values(Doctor.objects.using(DEFAULT_DB_ALIAS))
+            data = reader.serialize(rows)
+            payload = {
+                'count': len(data),
+                'doctors': data
+            }
+            if not cached:
+                return Response(payload, status=status.HTTP_200_OK)
+            entry = doctor_cache.set('list', payload, version=version)
+            return doctor_cache.response(request, entry, hit=False)
+        
+        except ParseError as e:
             return Response({
-                'count': queryset.count(),
-                'doctors': serializer.data
-            }, status=status.HTTP_200_OK)
+                'error': str(e.detail)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         except Exception as e:
             return Response({
@@ -51,16 +93,27 @@ class DoctorViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, pk=None):
         """Get details of a specific doctor"""
         try:
-            doctor = self.get_queryset().filter(pk=pk).first()
+            cached = doctor_cache.serves(request)
+            version = doctor_cache.get_version() if cached else None
+            entry = doctor_cache.get(f'detail:{pk}', version) if cached else None
+            if entry is not None:
+                return doctor_cache.response(request, entry, hit=True)
+            
+            queryset = Doctor.objects.using(DEFAULT_DB_ALIAS) if cached else self.get_queryset()
+            doctor = queryset.filter(pk=pk).first()
             if not doctor:
                 return Response({
                     'error': 'Doctor not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
             serializer = self.get_serializer(doctor)
-            return Response({
+            payload = {
                 'doctor': serializer.data
-            }, status=status.HTTP_200_OK)
+            }
+            if not cached:
+                return Response(payload, status=status.HTTP_200_OK)
+            entry = doctor_cache.set(f'detail:{pk}', payload, etag=instance_etag(doctor), last_modified=doctor.updated_at, version=version)
+            return doctor_cache.response(request, entry, hit=False)
         
         except Exception as e:
             return Response({
@@ -68,22 +121,32 @@ class DoctorViewSet(viewsets.ModelViewSet):
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @transaction.atomic
     def update(self, request, pk=None):
-        """Update doctor details"""
+        """Update doctor details (honours If-Match for optimistic concurrency)"""
         try:
-            doctor = self.get_queryset().filter(pk=pk).first()
+            queryset = self.get_queryset()
+            if is_conditional(request):
+                queryset = queryset.select_for_update()
+            doctor = queryset.filter(pk=pk).first()
             if not doctor:
                 return Response({
                     'error': 'Doctor not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
+            response = check_preconditions(request, etag=instance_etag(doctor), last_modified=doctor.updated_at)
+            if response is not None:
+                return response
+            
             serializer = self.get_serializer(doctor, data=request.data, partial=True)
             if serializer.is_valid():
                 doctor = serializer.save()
-                return Response({
-                    'message': 'Doctor updated successfully',
-                    'doctor': serializer.data
-                }, status=status.HTTP_200_OK)
+                if doctor is not None:
+                    response = Response({
+                        'message': 'Doctor updated successfully',
+                        'doctor': serializer.data
+                    }, status=status.HTTP_200_OK)
+                    return set_validators(response, etag=instance_etag(doctor), last_modified=doctor.updated_at)
             
             return Response({
                 'error': 'Doctor update failed',
@@ -110,6 +173,94 @@ class DoctorViewSet(viewsets.ModelViewSet):
                 'message': 'Doctor deleted successfully'
             }, status=status.HTTP_200_OK)
         
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create many doctors in one request"""
+        try:
+            mode = request.query_params.get('mode', 'atomic')
+            created, errors = bulk_create_records(DoctorSerializer, request.data, mode=mode)
+            if created:
+                # bulk_create does not send post_save
+                transaction.on_commit(doctor_cache.invalidate)
+            
+            if not created:
+                return Response({
+                    'error': 'Bulk doctor creation failed',
+                    'details': errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                'message': 'Doctors created successfully',
+                'created_count': len(created),
+                'doctors': DoctorSerializer(created, many=True).data,
+                'errors': errors
+            }, status=status.HTTP_201_CREATED)
+        
+        except BulkCreateError as e:
+            return Response({
+                'error': 'Bulk doctor creation failed',
+                'details': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Hit/miss statistics for the doctor directory cache"""
+        return Response(doctor_cache.stats(), status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """Doctors created, updated or deleted after the since cursor"""
+        try:
+            return change_feed(
+                request,
+                Doctor.objects.all(),
+                DoctorSerializer,
+                resource='doctor',
+            )
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """Search doctors by name, specialty and hospital, best matches first"""
+        try:
+            query = request.query_params.get('q', '').strip()
+            if not query:
+                return Response({
+                    'error': 'Doctor search failed',
+                    'details': "The 'q' query parameter is required."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                limit = min(int(request.query_params.get('limit', settings.DOCTOR_SEARCH_LIMIT)), settings.DOCTOR_SEARCH_MAX_LIMIT)
+            except ValueError:
+                return Response({
+                    'error': 'Doctor search failed',
+                    'details': "'limit' must be an integer."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            doctors = search_doctors(query, max(limit, 1), queryset=self.get_queryset())
+            return Response({
+                'count': len(doctors),
+                'doctors': doctors
+            }, status=status.HTTP_200_OK)
+        
         except Exception as e:
             return Response({
                 'error': 'Internal server error',
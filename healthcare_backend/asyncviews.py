@@ -0,0 +1,140 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, Throttled
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from authentication.authentication import ClaimsJWTAuthentication
+from authentication.cache import user_snapshots
+from authentication.revocation import revoked_tokens
+from .renderers import FastJSONRenderer
+
+
+class AsyncJWTAuthentication(ClaimsJWTAuthentication):
+    """
+    ``ClaimsJWTAuthentication`` for async views.
+
+    Header parsing, token validation and the snapshot cache are inherited
+    unchanged; only a snapshot cache miss or a due revocation sync touches
+    the database, through the async ORM.
+    """
+
+    async def aauthenticate(self, request, allow_query_token=False):
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None and allow_query_token:
+            # Browser EventSource clients cannot set headers
+            raw_token = request.GET.get('token')
+        if raw_token is None:
+            return None
+
+        await revoked_tokens.async_sync_if_due()
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        snapshot = user_snapshots.get(user_id, validated_token)
+        if snapshot is None:
+            snapshot = await user_snapshots.aload(user_id)
+        return self.check_user(snapshot)
+
+    def sync_revocations(self):
+        # Synced in aauthenticate without blocking the event loop
+        pass
+
+
+authenticator = AsyncJWTAuthentication()
+
+
+async def authenticate(request, allow_query_token=False):
+    """Return the authenticated user, raising ``NotAuthenticated``/``AuthenticationFailed`` like DRF would"""
+    result = await authenticator.aauthenticate(request, allow_query_token=allow_query_token)
+    if result is None:
+        raise NotAuthenticated()
+    return result[0]
+
+
+async def check_throttles(request, throttle_classes):
+    """Raise ``Throttled`` when any throttle rejects ``request``, as ``APIView.check_throttles`` does"""
+    durations = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        # Buckets live in the throttle cache, whose calls may block
+        if not await sync_to_async(throttle.allow_request)(request, None):
+            durations.append(throttle.wait())
+    if durations:
+        raise Throttled(max((duration for duration in durations if duration is not None), default=None))
+
+
+negotiator = DefaultContentNegotiation()
+
+
+def negotiate(request):
+    """Pick the renderer for ``request`` from the default renderers, as ``APIView`` does"""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    request.accepted_renderer, request.accepted_media_type = negotiator.select_renderer(request, renderers)
+
+
+def render_response(response, request=None):
+    """Render a DRF ``Response`` outside of an ``APIView``, in the negotiated format (JSON without one)"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is None:
+        response.accepted_renderer = FastJSONRenderer()
+        response.accepted_media_type = FastJSONRenderer.media_type
+    else:
+        response.accepted_renderer = renderer
+        response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = {}
+    return response.render()
+
+
+def exception_response(exc):
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    response = Response(detail, status=exc.status_code)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        response['WWW-Authenticate'] = authenticator.authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def async_api_view(view):
+    """
+    Turn an async function into a read-only API view for ASGI deployments.
+
+    The request is wrapped in a DRF ``Request``, authenticated with the
+    same JWT rules as the viewsets without blocking the event loop, and
+    checked against the view's ``throttle_classes`` (set with DRF's
+    ``@throttle_classes``, as on ``@api_view`` functions). The view returns a
+    DRF ``Response`` which is rendered in the format negotiated from
+    ``Accept``. Unexpected errors get the usual ``Internal server error``
+    envelope.
+    """
+    throttle_classes = getattr(view, 'throttle_classes', api_settings.DEFAULT_THROTTLE_CLASSES)
+
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(request)
+        try:
+            negotiate(request)
+            request.user = await authenticate(request)
+            await check_throttles(request, throttle_classes)
+            response = await view(request, *args, **kwargs)
+        except APIException as exc:
+            response = exception_response(exc)
+        except Exception as e:
+            response = Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if isinstance(response, Response):
+            response = render_response(response, request)
+        return response
+    return wrapper
@@ -0,0 +1,100 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+BULK_MODES = ('atomic', 'partial')
+
+
+class BulkCreateError(Exception):
+    """Raised when a bulk payload cannot be processed at all"""
+
+
+def bulk_create_records(serializer_class, rows, mode='atomic', **save_kwargs):
+    """
+    Validate and insert many rows for ``serializer_class`` in a handful of queries.
+
+    Every row goes through the serializer's field validation. Uniqueness for
+    the fields listed in its ``unique_error_messages`` is checked with one
+    set-based query plus an in-payload duplicate check, and valid rows are
+    inserted with ``bulk_create`` in batches of ``BULK_CREATE_BATCH_SIZE``.
+
+    In ``atomic`` mode nothing is written if any row fails; in ``partial``
+    mode the valid rows are written and the failures are reported. Returns
+    ``(created_instances, errors)`` where each error is
+    ``{'index': <row position>, 'errors': {...}}``.
+    """
+    if mode not in BULK_MODES:
+        raise BulkCreateError(f"mode must be one of: {', '.join(BULK_MODES)}")
+    if not isinstance(rows, list):
+        raise BulkCreateError('Expected a list of records.')
+    if not rows:
+        raise BulkCreateError('No records provided.')
+    if len(rows) > settings.BULK_CREATE_MAX_RECORDS:
+        raise BulkCreateError(f'At most {settings.BULK_CREATE_MAX_RECORDS} records can be created per request.')
+
+    model = serializer_class.Meta.model
+    unique_messages = {
+        field: message for field, message in serializer_class.unique_error_messages.items()
+        if isinstance(field, str)
+    }
+
+    errors = {}
+    valid = {}
+    for index, row in enumerate(rows):
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            errors[index] = dict(serializer.errors)
+
+    taken = find_taken_values(model, unique_messages, valid.values())
+    for index, data in valid.items():
+        row_errors = {}
+        for field, message in unique_messages.items():
+            value = data.get(field)
+            if value in taken[field]:
+                row_errors[field] = [message]
+            taken[field].add(value)
+        if row_errors:
+            errors[index] = row_errors
+
+    if errors and mode == 'atomic':
+        return [], format_errors(errors)
+
+    instances = [
+        model(**data, **save_kwargs)
+        for index, data in valid.items()
+        if index not in errors
+    ]
+    try:
+        with transaction.atomic():
+            created = model.objects.bulk_create(instances, batch_size=settings.BULK_CREATE_BATCH_SIZE)
+    except IntegrityError:
+        # A concurrent writer claimed one of the unique values after our check
+        raise BulkCreateError('Records conflict with concurrent changes, please retry.')
+
+    return created, format_errors(errors)
+
+
+def find_taken_values(model, unique_messages, rows):
+    """Return the already-stored values of each unique field, in one query"""
+    rows = list(rows)
+    taken = {field: set() for field in unique_messages}
+    lookups = [
+        Q(**{f'{field}__in': {row[field] for row in rows if field in row}})
+        for field in unique_messages
+    ]
+    if not rows or not lookups:
+        return taken
+
+    for values in model.objects.filter(reduce(or_, lookups)).values_list(*unique_messages):
+        for field, value in zip(unique_messages, values):
+            taken[field].add(value)
+    return taken
+
+
+def format_errors(errors):
+    return [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
@@ -0,0 +1,99 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+CONDITIONAL_HEADERS = (
+    'HTTP_IF_MATCH',
+    'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_UNMODIFIED_SINCE',
+)
+
+
+def is_conditional(request):
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8'), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def collection_etag(request, count, last_modified, *extra):
+    """
+    ETag for a collection: the request path and query plus row count and the
+    newest change of each tracked timestamp (including those of nested rows).
+    """
+    stamps = [value.isoformat() if value else '' for value in last_modified]
+    return make_etag(request.get_full_path(), count, *stamps, *extra)
+
+
+def etag_aggregates(fields):
+    aggregates = {f'last_{index}': Max(field) for index, field in enumerate(fields)}
+    return {'count': Count('pk'), **aggregates}
+
+
+def queryset_etag(request, queryset, fields=('updated_at',), extra=()):
+    """Collection ETag computed in the database with a single aggregate query"""
+    result = queryset.order_by().aggregate(**etag_aggregates(fields))
+    return collection_etag(request, result.pop('count'), list(result.values()), *extra)
+
+
+async def aqueryset_etag(request, queryset, fields=('updated_at',), extra=()):
+    """Async counterpart of ``queryset_etag``"""
+    result = await queryset.order_by().aaggregate(**etag_aggregates(fields))
+    return collection_etag(request, result.pop('count'), list(result.values()), *extra)
+
+
+def rows_etag(request, rows, fields=('updated_at',), extra=()):
+    """Collection ETag computed from rows that have already been fetched"""
+    last_modified = [
+        max((resolve(row, field) for row in rows), default=None)
+        for field in fields
+    ]
+    return collection_etag(request, len(rows), last_modified, *extra)
+
+
+def resolve(instance, path):
+    if isinstance(instance, dict):
+        # values() rows are keyed by the lookup path itself
+        return instance[path]
+    for name in path.split('__'):
+        instance = getattr(instance, name)
+    return instance
+
+
+def instance_etag(instance, fields=('updated_at',)):
+    stamps = [resolve(instance, field).isoformat() for field in fields]
+    return make_etag(instance._meta.label, instance.pk, *stamps)
+
+
+def check_preconditions(request, etag=None, last_modified=None):
+    """
+    Evaluate If-Match / If-None-Match / If-(Un)Modified-Since against the
+    current validators. Returns a 304 or 412 response when the request should
+    stop here, otherwise ``None``.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        return None
+    if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+        return Response({
+            'error': 'Precondition failed',
+            'details': 'The resource has been modified since the supplied validator was issued'
+        }, status=status.HTTP_412_PRECONDITION_FAILED)
+    return set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(timegm(last_modified.utctimetuple()))
+    return response
@@ -0,0 +1,94 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from authentication.lastlogin import last_logins
+from .routers import replica_selector
+
+
+class ConnectionStats:
+    """Per-process count of database connections opened versus requests served"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened = {}
+        self.requests = 0
+    
+    def connection_opened(self, sender, connection, **kwargs):
+        with self.lock:
+            self.opened[connection.alias] = self.opened.get(connection.alias, 0) + 1
+    
+    def request_finished(self, sender, **kwargs):
+        with self.lock:
+            self.requests += 1
+    
+    def snapshot(self):
+        with self.lock:
+            return dict(self.opened), self.requests
+
+
+connection_stats = ConnectionStats()
+connection_created.connect(connection_stats.connection_opened, dispatch_uid='diagnostics-connection-opened')
+request_finished.connect(connection_stats.request_finished, dispatch_uid='diagnostics-request-finished')
+
+
+def pool_stats(connection):
+    """psycopg 3 pool statistics, or None when the alias is not pooled"""
+    pool = getattr(connection, 'pool', None)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    return {
+        'min_size': stats.get('pool_min'),
+        'max_size': stats.get('pool_max'),
+        'size': stats.get('pool_size'),
+        'available': stats.get('pool_available'),
+        'waiting': stats.get('requests_waiting', 0),
+        'saturation': round(1 - stats.get('pool_available', 0) / stats['pool_max'], 4) if stats.get('pool_max') else None,
+        'requests': stats.get('requests_num', 0),
+        'queued': stats.get('requests_queued', 0),
+        'wait_ms': stats.get('requests_wait_ms', 0),
+        'timeouts': stats.get('requests_errors', 0),
+        'connections_opened': stats.get('connections_num', 0),
+        'connect_ms': stats.get('connections_ms', 0),
+    }
+
+
+def database_stats():
+    opened, requests = connection_stats.snapshot()
+    databases = {}
+    for connection in connections.all():
+        databases[connection.alias] = {
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'connections_opened': opened.get(connection.alias, 0),
+            'pool': pool_stats(connection),
+        }
+    return {
+        'requests': requests,
+        'databases': databases,
+        'replica_policy': settings.DB_REPLICA_POLICY,
+        'replica_lag': replica_selector.stats(),
+        'last_login_queue': last_logins.stats(),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def database_diagnostics(request):
+    """Connection reuse and pool saturation for this worker process"""
+    try:
+        return Response(database_stats(), status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response({
+            'error': 'Internal server error',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
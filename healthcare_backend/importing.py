@@ -0,0 +1,258 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from .bulk import find_taken_values
+
+
+class MalformedRow:
+    """An NDJSON line that could not be decoded; rejected like a row that fails validation"""
+
+    def __init__(self, line, error):
+        self.line = line
+        self.error = error
+
+
+def read_rows(path, file_format):
+    """Yield one dict per record (or a ``MalformedRow``), reading the file lazily"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if file_format == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield MalformedRow(line.rstrip('\n'), e)
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream ``rows`` into ``table`` with PostgreSQL COPY (psycopg2 or psycopg 3)"""
+    buffer = io.StringIO()
+    # Quote every non-numeric value so empty strings are not read back as NULL
+    csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(sql, buffer)
+    else:
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+class StreamingImportCommand(BaseCommand):
+    """
+    Base class for commands that load large CSV/NDJSON exports into a model.
+
+    Input is read lazily and handled in chunks of ``--chunk-size`` rows, so
+    memory stays flat regardless of file size. Each row is validated with
+    ``serializer_class``; on PostgreSQL valid rows are COPY'd into a temporary
+    staging table and merged with a single ``INSERT ... SELECT ... ON CONFLICT
+    DO NOTHING``, while other backends fall back to ``bulk_create``. Rejected
+    rows, undecodable NDJSON lines included, are written to an NDJSON side file, and the number of consumed rows
+    is recorded in a checkpoint file after every committed chunk so an
+    interrupted import can be resumed with ``--resume``.
+    """
+    serializer_class = None
+    label = 'records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Input format (default: from file extension)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows validated and written per transaction')
+        parser.add_argument('--rejects', help='NDJSON file for rejected rows (default: <path>.rejects.ndjson)')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Skip rows already imported according to the checkpoint')
+
+    def get_extra_values(self, options):
+        """Values for model fields that are not part of the input rows"""
+        return {}
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size must be positive')
+
+        file_format = options['format'] or ('ndjson' if path.suffix in ('.ndjson', '.jsonl') else 'csv')
+        rejects_path = Path(options['rejects'] or f'{path}.rejects.ndjson')
+        checkpoint_path = Path(options['checkpoint'] or f'{path}.checkpoint')
+        extra_values = self.get_extra_values(options)
+
+        offset = self.read_checkpoint(checkpoint_path) if options['resume'] else 0
+        rows = read_rows(path, file_format)
+        if offset:
+            self.stdout.write(f'Resuming after row {offset}')
+            rows = islice(rows, offset, None)
+
+        inserted = rejected = 0
+        started = time.monotonic()
+        with open(rejects_path, 'a' if options['resume'] else 'w', encoding='utf-8') as rejects:
+            while True:
+                chunk = list(islice(rows, options['chunk_size']))
+                if not chunk:
+                    break
+
+                chunk_inserted, chunk_rejects = self.import_chunk(chunk, offset, extra_values)
+                for reject in chunk_rejects:
+                    rejects.write(json.dumps(reject, default=str) + '\n')
+                rejects.flush()
+
+                offset += len(chunk)
+                inserted += chunk_inserted
+                rejected += len(chunk_rejects)
+                self.write_checkpoint(checkpoint_path, offset)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{offset} rows processed, {inserted} inserted, {rejected} rejected '
+                    f'({(inserted + rejected) / elapsed:.0f} rows/s)'
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {inserted} {self.label} in {elapsed:.1f}s, {rejected} rejected (see {rejects_path})'
+        ))
+
+    def import_chunk(self, chunk, offset, extra_values):
+        valid = []
+        rejects = []
+        for position, row in enumerate(chunk, start=offset + 1):
+            if isinstance(row, MalformedRow):
+                errors = {api_settings.NON_FIELD_ERRORS_KEY: [f'Invalid JSON: {row.error}']}
+                rejects.append({'row': position, 'errors': errors, 'data': row.line})
+                continue
+            serializer = self.serializer_class(data=row)
+            if serializer.is_valid():
+                valid.append((position, row, serializer.validated_data))
+            else:
+                rejects.append({'row': position, 'errors': serializer.errors, 'data': row})
+
+        if not valid:
+            return 0, rejects
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                inserted_keys = self.merge_with_copy(valid, extra_values)
+            else:
+                inserted_keys = self.merge_with_bulk_create(valid, extra_values)
+
+        key_field = self.get_key_field()
+        inserted = 0
+        conflicts = []
+        for position, row, data in valid:
+            key = data[key_field]
+            if key in inserted_keys:
+                inserted_keys.discard(key)
+                inserted += 1
+            else:
+                conflicts.append((position, row, data))
+
+        if conflicts:
+            unique_messages = self.get_unique_messages()
+            model = self.serializer_class.Meta.model
+            taken = find_taken_values(model, unique_messages, [data for _, _, data in conflicts])
+            for position, row, data in conflicts:
+                errors = {
+                    field: [message] for field, message in unique_messages.items()
+                    if data.get(field) in taken[field]
+                }
+                rejects.append({'row': position, 'errors': errors, 'data': row})
+        rejects.sort(key=lambda reject: reject['row'])
+        return inserted, rejects
+
+    def get_unique_messages(self):
+        return {
+            field: message for field, message in self.serializer_class.unique_error_messages.items()
+            if isinstance(field, str)
+        }
+
+    def get_key_field(self):
+        """The unique field used to tell inserted rows apart from conflicting ones"""
+        unique_messages = self.get_unique_messages()
+        if not unique_messages:
+            raise CommandError(f'{self.serializer_class.__name__} declares no unique field')
+        return next(iter(unique_messages))
+
+    def get_columns(self, extra_values):
+        model = self.serializer_class.Meta.model
+        names = [
+            name for name, field in self.serializer_class().fields.items()
+            if not field.read_only
+        ]
+        fields = [model._meta.get_field(name) for name in names]
+        fields += [model._meta.get_field(name) for name in extra_values]
+        return [field for field in fields if not field.primary_key]
+
+    def build_instances(self, valid, extra_values):
+        model = self.serializer_class.Meta.model
+        return [model(**data, **extra_values) for _, _, data in valid]
+
+    def merge_with_copy(self, valid, extra_values):
+        model = self.serializer_class.Meta.model
+        table = connection.ops.quote_name(model._meta.db_table)
+        key_column = model._meta.get_field(self.get_key_field()).column
+        fields = self.get_columns(extra_values)
+        columns = [connection.ops.quote_name(field.column) for field in fields]
+        timestamp_columns = [
+            connection.ops.quote_name(field.column) for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+
+        rows = []
+        for instance in self.build_instances(valid, extra_values):
+            rows.append([field.get_db_prep_value(getattr(instance, field.attname), connection) for field in fields])
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS import_staging')
+            cursor.execute(
+                f"CREATE TEMP TABLE import_staging ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+            )
+            cursor.execute('ALTER TABLE import_staging ADD COLUMN import_row bigserial')
+            copy_rows(cursor, 'import_staging', columns, rows)
+
+            target_columns = columns + timestamp_columns
+            select_columns = columns + ['%s'] * len(timestamp_columns)
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(target_columns)}) "
+                f"SELECT {', '.join(select_columns)} FROM import_staging ORDER BY import_row "
+                f"ON CONFLICT DO NOTHING RETURNING {connection.ops.quote_name(key_column)}",
+                [timezone.now()] * len(timestamp_columns),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def merge_with_bulk_create(self, valid, extra_values):
+        model = self.serializer_class.Meta.model
+        unique_messages = self.get_unique_messages()
+        taken = find_taken_values(model, unique_messages, [data for _, _, data in valid])
+
+        instances = []
+        for instance in self.build_instances(valid, extra_values):
+            values = {field: getattr(instance, field) for field in unique_messages}
+            if any(value in taken[field] for field, value in values.items()):
+                continue
+            for field, value in values.items():
+                taken[field].add(value)
+            instances.append(instance)
+
+        model.objects.bulk_create(instances)
+        key_field = self.get_key_field()
+        return {getattr(instance, key_field) for instance in instances}
+
+    def read_checkpoint(self, path):
+        if not path.exists():
+            return 0
+        return json.loads(path.read_text())['offset']
+
+    def write_checkpoint(self, path, offset):
+        path.write_text(json.dumps({'offset': offset}))
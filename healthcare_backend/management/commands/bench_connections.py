@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from healthcare_backend.diagnostics import connection_stats
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Measure per-request database connection overhead with and without persistent connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+        parser.add_argument('--requests', type=int, default=500, help='Simulated requests per mode')
+        parser.add_argument('--max-age', type=int, default=60, help='CONN_MAX_AGE used for the persistent modes')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        pooled = getattr(connection, 'pool', None) is not None
+        modes = [
+            ('pooled' if pooled else 'per-request', 0, False),
+            ('persistent', options['max_age'], False),
+            ('persistent+checks', options['max_age'], True),
+        ]
+        if pooled:
+            # The pool manages reuse itself and Django rejects CONN_MAX_AGE with it
+            modes = modes[:1]
+
+        original = {key: connection.settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        self.stdout.write(f"{'mode':<18} {'mean':>9} {'p50':>9} {'p99':>9} {'connects':>9}")
+        try:
+            for name, max_age, health_checks in modes:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                timings, connects = self.run(connection, options['requests'])
+                self.stdout.write(
+                    f"{name:<18} {sum(timings) / len(timings) * 1000:>7.3f}ms "
+                    f"{percentile(timings, 0.5) * 1000:>7.3f}ms {percentile(timings, 0.99) * 1000:>7.3f}ms "
+                    f"{connects:>9}"
+                )
+        finally:
+            connection.close()
+            connection.settings_dict.update(original)
+
+    def run(self, connection, count):
+        """
+        Replay ``count`` request cycles: the request signals open/close
+        connections exactly as the handler would around a single query.
+        """
+        opened_before = connection_stats.snapshot()[0].get(connection.alias, 0)
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append(time.perf_counter() - started)
+        opened = connection_stats.snapshot()[0].get(connection.alias, 0) - opened_before
+        return timings, opened
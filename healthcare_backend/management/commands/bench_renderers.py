@@ -0,0 +1,93 @@
+import gzip
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+
+
+def patient_rows(count, reader):
+    """
+    ``values()`` rows for the patient list, with the native types the
+    database returns (dates, aware datetimes), built without touching it
+    """
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    values = {
+        'id': lambda i: i + 1,
+        'created_by__email': lambda i: 'owner@example.com',
+        'name': lambda i: f'Patient {i}',
+        'email': lambda i: f'patient{i}@example.com',
+        'phone': lambda i: '+1 555 0100',
+        'date_of_birth': lambda i: date(1950, 1, 1) + timedelta(days=i % 20000),
+        'gender': lambda i: 'MFO'[i % 3],
+        'address': lambda i: f'{i} Main Street, Springfield',
+        'medical_history': lambda i: 'Seasonal allergies; appendectomy in 2009. ' * 3,
+        'created_at': lambda i: created + timedelta(seconds=i),
+        'updated_at': lambda i: created + timedelta(seconds=i, microseconds=i),
+    }
+    return [{column: values[column](i) for column in reader.columns} for i in range(count)]
+
+
+def native_payload(reader, rows):
+    """The list payload with the row values left as Python objects, for the renderers to encode"""
+    return {
+        'count': len(rows),
+        'patients': [{name: row[column] for name, column, _ in reader.steps} for row in rows],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare encode time and payload size of the JSON and MessagePack renderers on a patient list"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Patients in the list')
+        parser.add_argument('--repeat', type=int, default=20, help='Encodes per renderer')
+        parser.add_argument('--full', action='store_true', help='Include address and medical_history (?fields=...)')
+        parser.add_argument(
+            '--from-db', action='store_true', help='Encode the first --rows existing patients instead of generated rows',
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] <= 0 or options['repeat'] <= 0:
+            raise CommandError('--rows and --repeat must be positive')
+
+        reader = values_serializer(PatientSerializer, None if options['full'] else PatientSerializer.list_fields)
+        if options['from_db']:
+            rows = list(reader.values(Patient.objects.order_by('pk'))[:options['rows']])
+            if not rows:
+                raise CommandError('No patients to encode (load some with import_patients)')
+        else:
+            rows = patient_rows(options['rows'], reader)
+        # Native values exercise the renderers' own date and time encoding;
+        # serialized rows are what the list endpoints hand them
+        inputs = [('native', native_payload(reader, rows)), ('serialized', {
+            'count': len(rows),
+            'patients': reader.serialize(rows),
+        })]
+        renderers = [
+            ('json (stdlib)', JSONRenderer()),
+            ('json (orjson)' if orjson else 'json (fallback)', FastJSONRenderer()),
+        ]
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack skipped: msgpack is not installed'))
+
+        self.stdout.write(f"{len(rows)} rows")
+        self.stdout.write(f"{'input':<11} {'renderer':<16} {'p50':>9} {'min':>9} {'bytes':>10} {'gzip':>9}")
+        for label, data in inputs:
+            for name, renderer in renderers:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    body = renderer.render(data, renderer.media_type)
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"{label:<11} {name:<16} {statistics.median(timings) * 1000:>7.2f}ms {min(timings) * 1000:>7.2f}ms "
+                    f"{len(body):>10} {len(gzip.compress(body)):>9}"
+                )
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from healthcare_backend.readserializers import values_serializer
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientDoctorMappingListSerializer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+
+TARGETS = {
+    'patients': (Patient.objects.select_related('created_by'), PatientSerializer, PatientSerializer.list_fields),
+    'doctors': (Doctor.objects.all(), DoctorSerializer, None),
+    'mappings': (
+        PatientDoctorMapping.objects.select_related('patient__created_by', 'doctor'), PatientDoctorMappingListSerializer, None,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Compare list serialization throughput (rows/s) of the DRF serializers and their values()-based readers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS), help='Lists to benchmark')
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per list (taken from the existing data)')
+        parser.add_argument('--seconds', type=float, default=2, help='Time spent on each measurement')
+
+    def handle(self, *args, **options):
+        if options['rows'] <= 0:
+            raise CommandError('--rows must be positive')
+
+        self.stdout.write(
+            f"{'list':<9} {'rows':>6} {'drf rows/s':>11} {'values rows/s':>14} {'speedup':>8}"
+            f" {'serialize only':>15}"
+        )
+        for name in options['targets']:
+            queryset, serializer_class, fields = TARGETS[name]
+            queryset = queryset.order_by('pk')[:options['rows']]
+            count = queryset.count()
+            if not count:
+                self.stdout.write(self.style.WARNING(f'{name:<9} skipped: no rows (load some with the import commands)'))
+                continue
+
+            reader = values_serializer(serializer_class, fields)
+            kwargs = {} if fields is None else {'fields': fields}
+            drf = self.measure(lambda: serializer_class(list(queryset), many=True, **kwargs).data, count, options['seconds'])
+            fast = self.measure(lambda: reader.serialize(list(reader.values(queryset))), count, options['seconds'])
+
+            # The same comparison on rows that have already been fetched
+            instances, rows = list(queryset), list(reader.values(queryset))
+            drf_only = self.measure(lambda: serializer_class(instances, many=True, **kwargs).data, count, options['seconds'])
+            fast_only = self.measure(lambda: reader.serialize(rows), count, options['seconds'])
+            self.stdout.write(
+                f"{name:<9} {count:>6} {drf:>11.0f} {fast:>14.0f} {fast / drf:>7.1f}x"
+                f" {fast_only / drf_only:>14.1f}x"
+            )
+
+    def measure(self, serialize, count, seconds):
+        """Rows per second over repeated calls of ``serialize`` for ``seconds``"""
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        runs = 0
+        while time.perf_counter() < deadline:
+            serialize()
+            runs += 1
+        return runs * count / (time.perf_counter() - started)
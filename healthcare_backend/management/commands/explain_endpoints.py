@@ -0,0 +1,108 @@
+import re
+from itertools import combinations
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from authentication.models import User
+from doctors.views import DoctorViewSet
+from mappings.views import PatientDoctorMappingViewSet
+from patients.filters import PATIENT_ORDERINGS, filter_patients
+from patients.models import Patient
+from patients.views import PatientViewSet
+
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+}
+
+# One sample value per supported patient list filter (the age bounds form one range filter)
+PATIENT_FILTER_SAMPLES = {
+    'gender': {'gender': 'F'},
+    'age': {'min_age': '30', 'max_age': '40'},
+    'name': {'name': 'Jo'},
+    'email': {'email': 'patient@example.com'},
+}
+
+
+def patient_filter_queries(queryset, page_size):
+    """(label, queryset) for every combination of patient list filters under every allowed ordering"""
+    queries = []
+    for size in range(len(PATIENT_FILTER_SAMPLES) + 1):
+        for names in combinations(PATIENT_FILTER_SAMPLES, size):
+            params = {key: value for name in names for key, value in PATIENT_FILTER_SAMPLES[name].items()}
+            filtered = filter_patients(queryset, params)
+            for fields in PATIENT_ORDERINGS:
+                label = f"patients filter [{'+'.join(names) or 'none'}] ordering {','.join(fields)}"
+                queries.append((label, filtered.order_by(*fields, 'pk')[:page_size + 1]))
+    return queries
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the query behind each API endpoint and report any sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user whose data the endpoint queries are scoped to')
+        parser.add_argument('--page-size', type=int, default=20, help='Page size used for paginated queries')
+        parser.add_argument(
+            '--disable-seqscan', action='store_true',
+            help='Run with enable_seqscan=off (PostgreSQL) to check that an index path exists on small tables',
+        )
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if any sequential scan remains')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan for every query')
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"EXPLAIN analysis is not supported for the '{connection.vendor}' backend")
+
+        user = self.get_user(options['user'])
+        queries = self.get_endpoint_queries(user, options['page_size'])
+
+        offenders = []
+        with transaction.atomic():
+            if options['disable_seqscan'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in queries:
+                plan = queryset.explain()
+                tables = sorted(set(pattern.findall(plan)))
+                if tables:
+                    offenders.append(name)
+                    self.stdout.write(self.style.WARNING(f"{name}: sequential scan on {', '.join(tables)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{name}: OK"))
+                if options['verbose_plans']:
+                    self.stdout.write(plan)
+
+        self.stdout.write(f"{len(queries) - len(offenders)}/{len(queries)} endpoint queries avoid sequential scans")
+        if offenders and options['strict']:
+            raise CommandError(f"Sequential scans remain in: {', '.join(offenders)}")
+
+    def get_user(self, email):
+        users = User.objects.all()
+        user = users.filter(email=email).first() if email else users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No matching user found to scope endpoint queries to')
+        return user
+
+    def get_endpoint_queries(self, user, page_size):
+        request = SimpleNamespace(user=user, query_params={})
+        patients = PatientViewSet(request=request, format_kwarg=None).get_queryset()
+        doctors = DoctorViewSet(request=request, format_kwarg=None).get_queryset()
+        mappings = PatientDoctorMappingViewSet(request=request, format_kwarg=None).get_queryset()
+        patient = patients.first() or Patient(pk=0, email='')
+
+        return [
+            ('patients list', patients),
+            ('patients page', patients.order_by('-created_at', '-pk')[:page_size + 1]),
+            ('patients retrieve', patients.filter(pk=patient.pk)),
+            ('patients email check', Patient.objects.filter(email=patient.email)),
+            ('doctors list', doctors),
+            ('doctors page', doctors.order_by('name', 'pk')[:page_size + 1]),
+            ('doctors retrieve', doctors.filter(pk=0)),
+            ('mappings list', mappings.filter(patient__created_by=user)),
+            ('mappings page', mappings.filter(patient__created_by=user).order_by('-assigned_at', '-pk')[:page_size + 1]),
+            ('mappings by patient', mappings.filter(patient_id=patient.pk)),
+        ] + patient_filter_queries(patients, page_size)
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from authentication.models import User
+from patients.models import Patient
+
+# Sync (DRF viewset) path and its async counterpart for each read endpoint
+ENDPOINTS = {
+    'patients': ('/api/patients/', '/api/async/patients/'),
+    'patient': ('/api/patients/{patient}/', '/api/async/patients/{patient}/'),
+    'doctors': ('/api/doctors/', '/api/async/doctors/'),
+    'mappings': ('/api/mappings/', '/api/async/mappings/'),
+    'patient-doctors': ('/api/mappings/patient/{patient}/', '/api/async/mappings/patient/{patient}/'),
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client, enough to drive JSON GET endpoints at high concurrency"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        status = int(status_line.split()[1])
+        length = 0
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value.strip().lower() == 'close':
+                close = True
+        await self.reader.readexactly(length)
+        if close:
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class Command(BaseCommand):
+    help = "Compare requests/sec and latency of the sync read endpoints against their async (ASGI) counterparts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Email of the user the requests authenticate as')
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000', help='Base URL of the WSGI deployment')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001', help='Base URL of the ASGI deployment')
+        parser.add_argument(
+            '--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS),
+            help='Endpoints to compare',
+        )
+        parser.add_argument('--concurrency', type=int, default=200, help='Concurrent keep-alive connections')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run each endpoint')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user with email {options['user']}")
+        patient = Patient.objects.filter(created_by=user).first()
+        if patient is None:
+            raise CommandError(f"{user.email} has no patients to query")
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Accept': 'application/json'}
+
+        self.stdout.write(f"{'endpoint':<16} {'server':<5} {'req/s':>9} {'p50':>9} {'p99':>9} {'errors':>7}")
+        for name in options['endpoints']:
+            for server, base_url, path in (
+                ('wsgi', options['wsgi_url'], ENDPOINTS[name][0]),
+                ('asgi', options['asgi_url'], ENDPOINTS[name][1]),
+            ):
+                result = asyncio.run(self.run(
+                    base_url, path.format(patient=patient.pk), headers, options['concurrency'], options['duration']
+                ))
+                self.stdout.write(
+                    f"{name:<16} {server:<5} {result['rps']:>9.1f} "
+                    f"{result['p50'] * 1000:>7.1f}ms {result['p99'] * 1000:>7.1f}ms {result['errors']:>7}"
+                )
+
+    async def run(self, base_url, path, headers, concurrency, duration):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise CommandError('Only plain http:// targets are supported')
+        port = url.port or 80
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            connection = HTTPConnection(url.hostname, port)
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        status = await connection.get(path, headers)
+                    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                        errors += 1
+                        await connection.close()
+                        continue
+                    if status == 200:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        errors += 1
+            finally:
+                await connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        if not latencies:
+            raise CommandError(f'No successful responses from {base_url}{path}')
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': percentile(latencies, 0.5),
+            'p99': percentile(latencies, 0.99),
+            'errors': errors,
+        }
@@ -0,0 +1,187 @@
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Approximate row count for ``queryset`` from PostgreSQL planner statistics.
+
+    Unfiltered querysets read ``pg_class.reltuples``; filtered ones take the
+    top-level row estimate from ``EXPLAIN``. Other backends fall back to an
+    exact ``COUNT(*)``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            if row and row[0] >= 0:
+                return row[0]
+
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination.
+
+    Rows are ordered by ``ordering`` (one field or several, all in the same
+    direction; views may pick one per request by setting ``keyset_ordering``)
+    with the primary key as a tiebreak, and each page is fetched with a
+    ``WHERE (field, id) < (last_field, last_id)`` style predicate, so the
+    cost of the next page does not grow with depth.
+    Pagination only kicks in when the client sends ``cursor`` or
+    ``page_size``; otherwise the view returns the full collection as before.
+
+    The ``count`` query parameter picks how the total is reported: ``exact``
+    (the default) runs ``COUNT(*)``, ``estimate`` uses planner statistics and
+    ``none`` skips counting altogether.
+    """
+    ordering = '-created_at'
+    results_key = 'results'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    count_modes = ('exact', 'estimate', 'none')
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.count = self.get_count(queryset, request)
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset`` for views running on the event loop"""
+        if not self.is_requested(request):
+            return None
+
+        self.count = await self.aget_count(queryset, request)
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request, view)])
+
+    def get_ordering(self, view=None):
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The ordered, cursor-filtered queryset for the requested page (plus one row to detect a next page)"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(view)
+        self.field_names = [field.lstrip('-') for field in ordering]
+        self.descending = ordering[0].startswith('-')
+
+        pk_ordering = '-pk' if self.descending else 'pk'
+        queryset = queryset.order_by(*ordering, pk_ordering)
+
+        self.pk_name = queryset.model._meta.pk.attname
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            # (a, b, pk) < (x, y, z) spelled out as a < x OR (a = x AND b < y) OR ...
+            keys = self.field_names + ['pk']
+            lookup = 'lt' if self.descending else 'gt'
+            condition = Q()
+            for i, key in enumerate(keys):
+                condition |= Q(**dict(zip(keys[:i], cursor[:i])), **{f'{key}__{lookup}': cursor[i]})
+            queryset = queryset.filter(condition)
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, 'exact')
+        return mode if mode in self.count_modes else 'exact'
+
+    def get_count(self, queryset, request):
+        mode = self.get_count_mode(request)
+        if mode == 'none':
+            return None
+        if mode == 'estimate':
+            return estimate_count(queryset)
+        return queryset.count()
+
+    async def aget_count(self, queryset, request):
+        mode = self.get_count_mode(request)
+        if mode == 'none':
+            return None
+        if mode == 'estimate':
+            return await sync_to_async(estimate_count)(queryset)
+        return await queryset.acount()
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, instance):
+        if isinstance(instance, dict):
+            # A values() row, which must include the ordering fields and the pk
+            values = [instance[field_name] for field_name in [*self.field_names, self.pk_name]]
+        else:
+            values = [getattr(instance, field_name) for field_name in self.field_names] + [instance.pk]
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        payload = json.dumps(values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            *values, pk = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            if len(values) != len(self.field_names):
+                raise ValueError('Cursor does not match the ordering')
+            fields = [model._meta.get_field(field_name) for field_name in self.field_names]
+            return [field.to_python(value) for field, value in zip(fields, values)] + [int(pk)]
+        except Exception:
+            raise ParseError(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+        return url
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            self.results_key: data,
+        })
@@ -0,0 +1,152 @@
+import datetime
+import functools
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import fields as drf_fields, relations
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+from .serializers import SparseFieldsetMixin
+
+# Fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField)
+
+# Fields that need the model instance rather than one column
+INSTANCE_FIELDS = (relations.RelatedField, relations.ManyRelatedField, drf_fields.SerializerMethodField)
+
+
+def iso_datetime(value, zone):
+    # DateTimeField.to_representation with USE_TZ and the ISO 8601 format
+    if timezone.is_aware(value):
+        value = value.astimezone(zone)
+    else:
+        value = timezone.make_aware(value, zone)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def converter(field):
+    """
+    The function turning a database value into ``field``'s output, or
+    ``None`` when the value passes through unchanged. Fields without a
+    shortcut fall back to their own ``to_representation``. ``iso_datetime``
+    also takes the current time zone, bound once per serialization.
+    """
+    if isinstance(field, drf_fields.ChoiceField):
+        # Choice keys come back from the database as the same strings
+        if all(isinstance(key, str) for key in field.choices):
+            return None
+        return field.to_representation
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return None if field.pk_field is None else field.pk_field.to_representation
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, drf_fields.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        iso = output_format and output_format.lower() == drf_fields.ISO_8601
+        if settings.USE_TZ and iso and not hasattr(field, 'timezone'):
+            return iso_datetime
+        return field.to_representation
+    if isinstance(field, drf_fields.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format and output_format.lower() == drf_fields.ISO_8601:
+            return datetime.date.isoformat
+        return field.to_representation
+    if isinstance(field, INSTANCE_FIELDS) or field.source == '*':
+        raise ImproperlyConfigured(
+            f'{field.parent.__class__.__name__}.{field.field_name} cannot be read from values(); '
+            f'map it to a column in values_sources'
+        )
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only serialization from ``values()`` rows.
+
+    Produces the same output as ``serializer_class`` (restricted to
+    ``fields`` for sparse fieldsets) without building model instances or
+    running DRF's per-field machinery: the serializer's fields are compiled
+    once into ``(name, column, converter)`` steps, nested serializers
+    included, and each row is one pass over those steps. Fields that are not
+    backed by a column of their own, such as ``StringRelatedField``, are
+    mapped to one with the serializer's ``values_sources``.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        if issubclass(serializer_class, SparseFieldsetMixin):
+            serializer = serializer_class(fields=fields)
+        else:
+            serializer = serializer_class()
+        self.model = serializer_class.Meta.model
+        self.columns = []
+        self.steps = self.compile(serializer, prefix='')
+        self.zone_steps = {}
+
+    def compile(self, serializer, prefix):
+        sources = getattr(serializer, 'values_sources', {})
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            column = prefix + (sources.get(name) or field.source.replace('.', '__'))
+            if name in sources:
+                steps.append((name, column, None))
+            elif isinstance(field, BaseSerializer):
+                # Nested relations are expected to be non-null
+                steps.append((name, None, self.compile(field, prefix=column + '__')))
+                continue
+            else:
+                steps.append((name, column, converter(field)))
+            self.columns.append(column)
+        return steps
+
+    def values(self, queryset, extra=()):
+        """``queryset`` as ``values()`` rows with every column the output needs, plus ``extra`` and the pk"""
+        columns = dict.fromkeys([*self.columns, *extra, self.model._meta.pk.attname])
+        return queryset.values(*columns)
+
+    def bind(self, steps, zone):
+        """``steps`` with the datetime converters bound to ``zone``"""
+        bound = []
+        for name, column, convert in steps:
+            if column is None:
+                convert = self.bind(convert, zone)
+            elif convert is iso_datetime:
+                convert = functools.partial(iso_datetime, zone=zone)
+            bound.append((name, column, convert))
+        return bound
+
+    def get_steps(self):
+        zone = timezone.get_current_timezone() if settings.USE_TZ else None
+        steps = self.zone_steps.get(zone)
+        if steps is None:
+            steps = self.zone_steps[zone] = self.bind(self.steps, zone)
+        return steps
+
+    def to_representation(self, row, steps=None):
+        data = {}
+        for name, column, convert in self.get_steps() if steps is None else steps:
+            if column is None:
+                data[name] = self.to_representation(row, convert)
+                continue
+            value = row[column]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def serialize(self, rows):
+        steps = self.get_steps()
+        return [self.to_representation(row, steps) for row in rows]
+
+
+@functools.lru_cache(maxsize=128)
+def cached_values_serializer(serializer_class, fields):
+    return ValuesSerializer(serializer_class, fields=fields)
+
+
+def values_serializer(serializer_class, fields=None):
+    """Compiled ``ValuesSerializer`` for ``serializer_class`` and ``fields``, built once per combination"""
+    return cached_values_serializer(serializer_class, None if fields is None else tuple(fields))
@@ -0,0 +1,80 @@
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+
+def encode_default(value, encoder=JSONEncoder()):
+    """Types the encoders lack (Decimal, lazy strings, querysets, ...), converted as DRF's JSONEncoder does"""
+    return encoder.default(value)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    ``JSONRenderer`` on top of orjson, when it is installed.
+
+    orjson writes datetimes, dates, times and UUIDs itself (UTC as ``Z``,
+    as DRF does); anything else it cannot encode, such as ``Decimal``, goes
+    through DRF's ``JSONEncoder``. The bytes match DRF's compact UTF-8
+    output. Indented output, payloads orjson rejects (e.g. integers beyond
+    64 bits) and installs without orjson use the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            body = orjson.dumps(data, default=encode_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in body or b'\xe2\x80\xa9' in body:
+            body = body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return body
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    ``application/msgpack`` responses for internal service clients.
+
+    Values are packed as their JSON counterparts (datetimes as ISO strings,
+    ``Decimal`` as floats), so clients see the same data in either format.
+    Enabled with ``MSGPACK_ENABLED``; requires msgpack.
+    """
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """``application/msgpack`` request bodies (see ``MessagePackRenderer``)"""
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc or exc.__class__.__name__}')
@@ -0,0 +1,185 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Set for the duration of a read-only request that may be served by a replica
+replica_reads = ContextVar('replica_reads', default=False)
+
+LAG_QUERY = {
+    'postgresql': (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+
+@contextmanager
+def use_replicas():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaSelector:
+    """
+    Picks the replica alias for a read according to ``DB_REPLICA_POLICY``.
+
+    ``round_robin`` cycles through ``REPLICA_DATABASES``; ``least_lag``
+    measures each replica's replay lag (at most every
+    ``DB_REPLICA_LAG_CHECK_SECONDS``) and picks the freshest one. Replicas
+    lagging more than ``DB_REPLICA_MAX_LAG_SECONDS``, or that cannot be
+    reached, are skipped; if none qualify reads fall back to the primary.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cycle = None
+        self.cycle_aliases = None
+        self.lag = {}
+        self.checked_at = 0
+
+    def choose(self):
+        replicas = list(settings.REPLICA_DATABASES)
+        if not replicas:
+            return None
+        if settings.DB_REPLICA_POLICY == 'least_lag':
+            return self.least_lagging(replicas)
+        return self.next_in_cycle(replicas)
+
+    def next_in_cycle(self, replicas):
+        with self.lock:
+            if self.cycle_aliases != replicas:
+                self.cycle = itertools.cycle(replicas)
+                self.cycle_aliases = replicas
+            return next(self.cycle)
+
+    def least_lagging(self, replicas):
+        lag = self.get_lag(replicas)
+        candidates = [alias for alias in replicas if lag.get(alias, float('inf')) <= settings.DB_REPLICA_MAX_LAG_SECONDS]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda alias: lag[alias])
+
+    def get_lag(self, replicas):
+        with self.lock:
+            if time.monotonic() - self.checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+                return self.lag
+            # Claim the refresh so concurrent requests keep using the previous figures
+            self.checked_at = time.monotonic()
+        lag = {alias: self.measure_lag(alias) for alias in replicas}
+        with self.lock:
+            self.lag = lag
+        return lag
+
+    def measure_lag(self, alias):
+        connection = connections[alias]
+        sql = LAG_QUERY.get(connection.vendor)
+        try:
+            if sql is None:
+                connection.ensure_connection()
+                return 0.0
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                return float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning('Replica %s is unreachable; routing reads elsewhere', alias, exc_info=True)
+            return float('inf')
+
+    def stats(self):
+        with self.lock:
+            return dict(self.lag)
+
+
+replica_selector = ReplicaSelector()
+
+
+class ReplicaRouter:
+    """
+    Sends reads made inside ``use_replicas()`` to a replica and everything
+    else to the primary. Reads inside an atomic block stay on the primary so
+    they see the transaction's own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica_selector.choose() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+def pin_key(user):
+    return f'db-pin:{user.pk}'
+
+
+def pin_to_primary(request, response):
+    """
+    Keep the client's reads on the primary for ``DB_STICKY_SECONDS`` after a
+    write, so it reads its own writes despite replication lag. Browsers carry
+    a signed cookie between workers; token clients are also pinned by user
+    in the cache.
+    """
+    window = settings.DB_STICKY_SECONDS
+    response.set_signed_cookie(
+        settings.DB_STICKY_COOKIE, '1', salt=settings.DB_STICKY_COOKIE,
+        max_age=window, httponly=True, samesite='Lax',
+    )
+    if request.user.is_authenticated:
+        cache.set(pin_key(request.user), True, window)
+
+
+def is_pinned_to_primary(request):
+    cookie = request.get_signed_cookie(
+        settings.DB_STICKY_COOKIE, default=None, salt=settings.DB_STICKY_COOKIE,
+        max_age=settings.DB_STICKY_SECONDS,
+    )
+    if cookie is not None:
+        return True
+    return request.user.is_authenticated and bool(cache.get(pin_key(request.user)))
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe (GET/HEAD/OPTIONS) requests from a replica unless the client
+    wrote recently; pin the client to the primary after a successful write.
+    Actions listed in ``primary_actions`` always read from the primary.
+    """
+    primary_actions = ('changes',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.REPLICA_DATABASES
+            and request.method in SAFE_METHODS
+            and self.action not in self.primary_actions
+            and not is_pinned_to_primary(request)
+        ):
+            self.replica_token = replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            replica_reads.reset(token)
+            self.replica_token = None
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and settings.REPLICA_DATABASES:
+            pin_to_primary(request, response)
+        return response
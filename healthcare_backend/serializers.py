@@ -0,0 +1,134 @@
+import re
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+# "Key (email)=(a@b.com) already exists." (PostgreSQL) and
+# "UNIQUE constraint failed: doctors_doctor.email" (SQLite)
+POSTGRES_KEY_RE = re.compile(r'Key \(([^)]*)\)=')
+SQLITE_KEY_RE = re.compile(r'UNIQUE constraint failed: (.+)')
+
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def unique_violation_columns(exc):
+    """Return the set of columns named by a unique violation, or None"""
+    message = str(exc)
+    match = POSTGRES_KEY_RE.search(message)
+    if match:
+        return {column.strip() for column in match.group(1).split(',')}
+    match = SQLITE_KEY_RE.search(message)
+    if match:
+        return {column.strip().split('.')[-1] for column in match.group(1).split(',')}
+    return None
+
+
+class ConstraintValidationMixin:
+    """
+    Enforce uniqueness through the database instead of pre-check queries.
+
+    DRF's generated ``UniqueValidator``/``UniqueTogetherValidator`` issue an
+    ``EXISTS`` query per constraint before every write, and still race under
+    concurrency. This mixin drops them and lets the INSERT/UPDATE hit the
+    unique constraint, translating the ``IntegrityError`` into the same error
+    payload a validator would have produced.
+
+    ``unique_error_messages`` maps a field name (field-level error) or a tuple
+    of field names (non-field error) to the message to report. When a
+    violation is caught, ``save()`` returns ``None`` and ``errors`` carries the
+    payload, so views can fall through to their usual 400 response.
+    """
+    unique_error_messages = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+    def get_validators(self):
+        return [
+            validator for validator in super().get_validators()
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as exc:
+            errors = self.get_unique_errors(exc)
+            if errors is None:
+                raise
+            self._errors = errors
+            return None
+
+    def get_unique_errors(self, exc):
+        columns = unique_violation_columns(exc)
+        if not columns:
+            return None
+
+        opts = self.Meta.model._meta
+        for key, message in self.unique_error_messages.items():
+            names = key if isinstance(key, tuple) else (key,)
+            if {opts.get_field(name).column for name in names} == columns:
+                field_name = key if isinstance(key, str) else api_settings.NON_FIELD_ERRORS_KEY
+                return {field_name: [message]}
+        return None
+
+
+class SparseFieldsetMixin:
+    """
+    Serialize only some of a serializer's fields.
+
+    The ``fields`` constructor argument names the fields to keep (``id`` is
+    always kept); ``None`` keeps them all. ``list_fields`` is the slim set
+    list views fall back to when the client does not send ``?fields=``, so
+    large columns stay out of every row unless asked for.
+    """
+    list_fields = None
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields) - {'id'}:
+                self.fields.pop(name)
+
+
+def requested_fields(request, serializer_class, default=None):
+    """Field names from ``?fields=a,b``, or ``default`` when absent; unknown names raise ``ValidationError``"""
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return default
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    available = serializer_class().fields
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError({
+            FIELDS_QUERY_PARAM: [f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}."]
+        })
+    return names
+
+
+def deferred_columns(serializer_class, fields, keep=()):
+    """
+    Model fields that none of ``fields`` reads, for ``QuerySet.defer()``.
+
+    ``keep`` names columns the view still needs itself, such as ordering,
+    ETag and ``select_related`` fields; deferring those would cost a query
+    per row (or fail outright).
+    """
+    if fields is None:
+        return []
+    sources = {field.source.split('.')[0] for field in serializer_class(fields=fields).fields.values()}
+    if '*' in sources:
+        return []
+    return [
+        field.name for field in serializer_class.Meta.model._meta.concrete_fields
+        if not field.primary_key and field.name not in sources and field.name not in keep
+    ]
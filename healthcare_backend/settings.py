@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
     'patients',
     'doctors',
     'mappings',
+    'changes',
+    'healthcare_backend',
 ]
 
 MIDDLEWARE = [
@@ -77,24 +80,103 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        # Keep connections open across requests (seconds; 0 closes after every
+        # request) and ping them before reuse so a dropped connection is
+        # replaced instead of failing the request.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Optional psycopg 3 connection pool (requires psycopg[pool] instead of
+# psycopg2). Pooled connections are handed back on close, so Django's own
+# persistence is switched off when the pool is on.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+            'check': ConnectionPool.check_connection if config('DB_POOL_CHECK', default=True, cast=bool) else None,
+        },
+    }
+
+# Read Replicas
+# DB_REPLICAS=host[:port][/name],... adds one alias per replica with the
+# primary's credentials. Safe requests to the patient, doctor and mapping
+# viewsets read from them (DB_REPLICA_POLICY: round_robin or least_lag);
+# clients that just wrote stay on the primary for DB_STICKY_SECONDS.
+REPLICA_DATABASES = []
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    location, _, name = replica.partition('/')
+    host, _, port = location.partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'NAME': name or DATABASES['default']['NAME'],
+        # Tests run against the primary unless the replica is a separate database
+        'TEST': {'MIRROR': 'default'} if config('DB_REPLICA_TEST_MIRROR', default=True, cast=bool) else {},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['healthcare_backend.routers.ReplicaRouter']
+DB_REPLICA_POLICY = config('DB_REPLICA_POLICY', default='round_robin')
+DB_REPLICA_MAX_LAG_SECONDS = config('DB_REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+DB_REPLICA_LAG_CHECK_SECONDS = config('DB_REPLICA_LAG_CHECK_SECONDS', default=2, cast=float)
+DB_STICKY_SECONDS = config('DB_STICKY_SECONDS', default=5, cast=int)
+DB_STICKY_COOKIE = config('DB_STICKY_COOKIE', default='db_primary')
+
+# Cache Configuration
+# Local memory by default; point CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache to share entries between workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='healthcare-backend'),
+    }
+}
+
+DOCTOR_CACHE_ALIAS = config('DOCTOR_CACHE_ALIAS', default='default')
+DOCTOR_CACHE_TIMEOUT = config('DOCTOR_CACHE_TIMEOUT', default=3600, cast=int)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'healthcare_backend.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'NUM_PROXIES': config('NUM_PROXIES', default=None, cast=lambda v: int(v) if v not in (None, '') else None),
 }
 
+# Opt-in MessagePack (application/msgpack) request and response bodies for
+# internal service clients, picked by the Accept and Content-Type headers.
+# Requires msgpack.
+MSGPACK_ENABLED = config('MSGPACK_ENABLED', default=False, cast=bool)
+if MSGPACK_ENABLED:
+    import msgpack  # noqa: F401 (fail at startup rather than on the first request)
+
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('healthcare_backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('healthcare_backend.renderers.MessagePackParser')
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME_MINUTES', default=60, cast=int)),
@@ -104,12 +186,110 @@ SIMPLE_JWT = {
     'UPDATE_LAST_LOGIN': True,
 }
 
+# Authenticated users are built from token claims and a snapshot cache
+# (see authentication.cache). Use a shared CACHES backend so user changes
+# reach every worker; AUTH_USER_CACHE_TTL bounds how long a worker's local
+# copy may lag behind.
+AUTH_USER_CACHE_ALIAS = config('AUTH_USER_CACHE_ALIAS', default='default')
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+
+# last_login is written behind logins in batches (see authentication.lastlogin)
+LAST_LOGIN_FLUSH_SECONDS = config('LAST_LOGIN_FLUSH_SECONDS', default=5, cast=float)
+LAST_LOGIN_FLUSH_SIZE = config('LAST_LOGIN_FLUSH_SIZE', default=500, cast=int)
+
+# Token Revocation
+# Logged-out and rotated tokens are recorded in authentication.RevokedToken
+# and checked in memory; each worker picks up other workers' revocations
+# every REVOKED_TOKENS_SYNC_SECONDS. Run `manage.py prune_revoked_tokens`
+# periodically to delete rows for tokens that have expired.
+REVOKED_TOKENS_SYNC_SECONDS = config('REVOKED_TOKENS_SYNC_SECONDS', default=5, cast=int)
+REVOKED_TOKENS_COMPACT_SECONDS = config('REVOKED_TOKENS_COMPACT_SECONDS', default=300, cast=int)
+
+# Rate Limiting (token buckets, see healthcare_backend.throttling)
+# Rates are '<burst>/<period>' keyed by '<endpoint>.<kind>', where kind is
+# ip, email, user or write; 'default.<kind>' applies to endpoints without
+# their own rate and an empty rate disables that bucket. Use a shared cache
+# with atomic incr (memcached, Redis) so buckets are enforced across workers.
+THROTTLE_CACHE_ALIAS = config('THROTTLE_CACHE_ALIAS', default='default')
+THROTTLE_RATES = {
+    'login.ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+    'login.email': config('THROTTLE_LOGIN_EMAIL', default='5/min'),
+    'register.ip': config('THROTTLE_REGISTER_IP', default='10/hour'),
+    'register.email': config('THROTTLE_REGISTER_EMAIL', default='3/hour'),
+    'refresh.ip': config('THROTTLE_REFRESH_IP', default='60/min'),
+    'default.user': config('THROTTLE_USER', default='600/min'),
+    'default.write': config('THROTTLE_WRITE', default='120/min'),
+}
+
+# Doctor Search
+# 'memory' serves /api/doctors/search/ from an in-process index rebuilt after
+# doctor changes; 'database' queries the full-text and trigram GIN indexes.
+DOCTOR_SEARCH_BACKEND = config('DOCTOR_SEARCH_BACKEND', default='memory')
+DOCTOR_SEARCH_LIMIT = config('DOCTOR_SEARCH_LIMIT', default=20, cast=int)
+DOCTOR_SEARCH_MAX_LIMIT = config('DOCTOR_SEARCH_MAX_LIMIT', default=100, cast=int)
+
+# Bulk Create Configuration
+BULK_CREATE_MAX_RECORDS = config('BULK_CREATE_MAX_RECORDS', default=1000, cast=int)
+BULK_CREATE_BATCH_SIZE = config('BULK_CREATE_BATCH_SIZE', default=500, cast=int)
+
+# Export Configuration
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Change Feed Configuration
+CHANGE_FEED_PAGE_SIZE = config('CHANGE_FEED_PAGE_SIZE', default=500, cast=int)
+CHANGE_FEED_MAX_PAGE_SIZE = config('CHANGE_FEED_MAX_PAGE_SIZE', default=5000, cast=int)
+# On PostgreSQL the feed also waits for every open write transaction, and
+# the settle delay only absorbs clock skew. Other databases rely on the
+# delay alone, so it must exceed the longest write transaction: a bulk
+# create of BULK_CREATE_MAX_RECORDS rows or one import_* chunk.
+CHANGE_FEED_SETTLE_SECONDS = config('CHANGE_FEED_SETTLE_SECONDS', default=2, cast=int)
+
+# Server-Sent Events Configuration
+# InMemoryBackend only reaches subscribers in the publishing process; use
+# changes.broker.PostgresNotifyBackend when running several workers.
+EVENT_BROKER_BACKEND = config('EVENT_BROKER_BACKEND', default='changes.broker.InMemoryBackend')
+EVENT_QUEUE_SIZE = config('EVENT_QUEUE_SIZE', default=100, cast=int)
+SSE_KEEPALIVE_SECONDS = config('SSE_KEEPALIVE_SECONDS', default=15, cast=int)
+SSE_RETRY_MILLISECONDS = config('SSE_RETRY_MILLISECONDS', default=3000, cast=int)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
+# Password Hashing
+# PASSWORD_HASHER (scrypt, argon2 or pbkdf2; argon2 needs argon2-cffi) is
+# used for new hashes. Hashes made with the others, or with older cost
+# parameters, are still accepted and upgraded on the next successful login.
+# Run `manage.py bench_hashers` to pick costs for the hardware.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+TUNED_PASSWORD_HASHERS = {
+    'scrypt': 'authentication.hashers.TunedScryptPasswordHasher',
+    'argon2': 'authentication.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'authentication.hashers.TunedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [TUNED_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in TUNED_PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PBKDF2_ITERATIONS = config('PBKDF2_ITERATIONS', default=1_000_000, cast=int)
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+SCRYPT_BLOCK_SIZE = config('SCRYPT_BLOCK_SIZE', default=8, cast=int)
+SCRYPT_PARALLELISM = config('SCRYPT_PARALLELISM', default=1, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=65536, cast=int)
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=1, cast=int)
+
+# Logins verify passwords on a bounded thread pool (see authentication.hashers)
+AUTHENTICATION_BACKENDS = ['authentication.backends.PooledHashingBackend']
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+PASSWORD_HASH_MAX_PENDING = config('PASSWORD_HASH_MAX_PENDING', default=4 * (os.cpu_count() or 1), cast=int)
+PASSWORD_HASH_QUEUE_TIMEOUT = config('PASSWORD_HASH_QUEUE_TIMEOUT', default=2, cast=float)
+
 # Password Validation
 AUTH_PASSWORD_VALIDATORS = [
     {
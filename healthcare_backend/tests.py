@@ -0,0 +1,29 @@
+from authentication.tests import OwnerTestCase
+
+
+class DatabaseDiagnosticsTests(OwnerTestCase):
+    """/api/diagnostics/database/ is for staff only and reports per-alias connection stats"""
+
+    def test_requires_admin(self):
+        self.assertEqual(self.client.get('/api/diagnostics/database/').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/diagnostics/database/').status_code, 401)
+
+    def test_reports_documented_keys(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/diagnostics/database/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            set(data), {'requests', 'databases', 'replica_policy', 'replica_lag', 'last_login_queue'},
+        )
+        self.assertEqual(
+            set(data['databases']['default']),
+            {'vendor', 'conn_max_age', 'health_checks', 'connections_opened', 'pool'},
+        )
+        self.assertEqual(
+            set(data['last_login_queue']),
+            {'pending', 'lag_seconds', 'flushes', 'written', 'failures', 'last_flush_at', 'last_flush_ms'},
+        )
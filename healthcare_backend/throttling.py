@@ -0,0 +1,136 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``'5/min'`` -> ``(5, 60)``: a bucket of 5 tokens refilled over 60 seconds"""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period.strip()[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle stored in the ``THROTTLE_CACHE_ALIAS`` cache.
+
+    Each bucket holds up to N tokens and refills at N per period, so clients
+    may burst up to N requests and then continue at the average rate. The
+    bucket is approximated with one counter per period-long window: the
+    previous window's count, weighted by how much of it still overlaps the
+    last period, plus the current one must stay within N. Counters only
+    change through ``cache.add`` and ``cache.incr``/``decr``, which are
+    atomic in memcached, Redis and within a LocMem process, so concurrent
+    requests in any worker cannot both take the last token. Rejected
+    requests give their count back. The rate comes from ``THROTTLE_RATES['<scope>.<kind>']``, falling back to
+    ``'default.<kind>'``; a missing or empty rate disables the throttle.
+    Subclasses say what a bucket is keyed on. Throttles run in
+    ``APIView.initial``, before any parsing, validation or hashing done by
+    the view.
+    """
+    scope = 'default'
+    kind = None
+    methods = None
+    timer = time.time
+
+    def get_ident_for(self, request):
+        raise NotImplementedError
+
+    def get_rate(self):
+        rates = settings.THROTTLE_RATES
+        rate = rates.get(f'{self.scope}.{self.kind}', rates.get(f'default.{self.kind}'))
+        return parse_rate(rate) if rate else None
+
+    def allow_request(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        rate = self.get_rate()
+        if rate is None:
+            return True
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return True
+
+        capacity, period = rate
+        key = f'throttle:{self.scope}.{self.kind}:{ident}'
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        position = self.timer() / period
+        window = int(position)
+        elapsed = position - window
+        current_key = f'{key}:{window}'
+
+        # Kept for two windows, so it is still there as the previous window
+        cache.add(current_key, 0, 2 * period)
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(current_key, 1, 2 * period)
+            count = 1
+        previous = cache.get(f'{key}:{window - 1}', 0)
+        allowed = previous * (1 - elapsed) + count <= capacity
+        if allowed:
+            self.wait_seconds = 0
+            return True
+
+        try:
+            cache.decr(current_key)
+        except ValueError:
+            pass
+        if count <= capacity:
+            # Fits later in this window, once enough of the previous one has slid out
+            fits_at = 1 - (capacity - count) / previous
+        else:
+            # Fits in the next window, once enough of this one has slid out
+            fits_at = 2 - (capacity - 1) / max(count - 1, 1)
+        self.wait_seconds = (fits_at - elapsed) * period
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Keyed on the client address (honouring ``NUM_PROXIES`` like DRF's own throttles)"""
+    kind = 'ip'
+
+    def get_ident_for(self, request):
+        return self.get_ident(request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    """Keyed on the ``email`` in the request body, so one account cannot be hammered from many addresses"""
+    kind = 'email'
+
+    def get_ident_for(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Keyed on the authenticated user, falling back to the client address"""
+    kind = 'user'
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return self.get_ident(request)
+
+
+class UserWriteTokenBucketThrottle(UserTokenBucketThrottle):
+    """Like ``UserTokenBucketThrottle``, but only counts writes"""
+    kind = 'write'
+    methods = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def scoped(scope, *throttle_classes):
+    """Copies of ``throttle_classes`` that use the ``<scope>.<kind>`` rates and their own buckets"""
+    return [
+        type(f'{scope.title()}{throttle_class.__name__}', (throttle_class,), {'scope': scope})
+        for throttle_class in throttle_classes
+    ]
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .diagnostics import database_diagnostics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +24,10 @@ urlpatterns = [
     path('api/patients/', include('patients.urls')),
     path('api/doctors/', include('doctors.urls')),
     path('api/mappings/', include('mappings.urls')),
+    path('api/events/', include('changes.urls')),
+    path('api/diagnostics/database/', database_diagnostics, name='database-diagnostics'),
+    # Async read endpoints for ASGI deployments (healthcare_backend/asgi.py)
+    path('api/async/patients/', include('patients.async_urls')),
+    path('api/async/doctors/', include('doctors.async_urls')),
+    path('api/async/mappings/', include('mappings.async_urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.mapping_list, name='async-mapping-list'),
+    path('patient/<int:patient_id>/', async_views.patient_doctors, name='async-patient-doctors'),
+]
@@ -0,0 +1,77 @@
+from rest_framework import status
+from rest_framework.decorators import throttle_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from .models import PatientDoctorMapping
+from .serializers import MAPPING_DEFERRED_PATIENT_FIELDS, PatientDoctorMappingListSerializer
+from .views import MAPPING_ETAG_FIELDS, MappingPagination, PatientDoctorMappingViewSet
+from patients.models import Patient
+from healthcare_backend.asyncviews import async_api_view
+from healthcare_backend.conditional import aqueryset_etag, check_preconditions, is_conditional, rows_etag, set_validators
+from healthcare_backend.readserializers import values_serializer
+
+def get_queryset():
+    return PatientDoctorMapping.objects.filter(is_active=True).select_related('patient__created_by', 'doctor').defer(*MAPPING_DEFERRED_PATIENT_FIELDS)
+
+@async_api_view
+@throttle_classes(PatientDoctorMappingViewSet.throttle_classes)
+async def mapping_list(request):
+    """Get all patient-doctor mappings"""
+    # Filter to show only mappings for patients created by the user
+    queryset = get_queryset().filter(patient__created_by=request.user)
+    reader = values_serializer(PatientDoctorMappingListSerializer)
+    rows = reader.values(queryset, extra=MAPPING_ETAG_FIELDS)
+    paginator = MappingPagination()
+    try:
+        page = await paginator.apaginate_queryset(rows, request)
+    except ParseError as e:
+        return Response({
+            'error': str(e.detail)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if page is not None:
+        return paginator.get_paginated_response(reader.serialize(page))
+    
+    if is_conditional(request):
+        etag = await aqueryset_etag(request, queryset, fields=MAPPING_ETAG_FIELDS)
+        response = check_preconditions(request, etag=etag)
+        if response is not None:
+            return response
+    
+    rows = [row async for row in rows.aiterator()]
+    data = reader.serialize(rows)
+    
+    response = Response({
+        'count': len(data),
+        'mappings': data
+    }, status=status.HTTP_200_OK)
+    return set_validators(response, etag=rows_etag(request, rows, fields=MAPPING_ETAG_FIELDS))
+
+@async_api_view
+@throttle_classes(PatientDoctorMappingViewSet.throttle_classes)
+async def patient_doctors(request, patient_id):
+    """Get all doctors assigned to a specific patient"""
+    # Verify patient exists and belongs to the user
+    patient = await Patient.objects.filter(id=patient_id, created_by=request.user).afirst()
+    if not patient:
+        return Response({
+            'error': 'Patient not found or access denied'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    queryset = get_queryset().filter(patient_id=patient_id)
+    if is_conditional(request):
+        etag = await aqueryset_etag(request, queryset, fields=MAPPING_ETAG_FIELDS, extra=[patient.updated_at])
+        response = check_preconditions(request, etag=etag)
+        if response is not None:
+            return response
+    
+    reader = values_serializer(PatientDoctorMappingListSerializer)
+    rows = [row async for row in reader.values(queryset, extra=MAPPING_ETAG_FIELDS).aiterator()]
+    data = reader.serialize(rows)
+    
+    response = Response({
+        'patient_name': patient.name,
+        'doctors_count': len(data),
+        'mappings': data
+    }, status=status.HTTP_200_OK)
+    etag = rows_etag(request, rows, fields=MAPPING_ETAG_FIELDS, extra=[patient.updated_at])
+    return set_validators(response, etag=etag)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_indexes'),
+        ('mappings', '0001_initial'),
+        ('patients', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['patient', '-assigned_at', '-id'], name='mapping_active_patient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-assigned_at', '-id'], name='mapping_active_assigned_idx'),
+        ),
+    ]
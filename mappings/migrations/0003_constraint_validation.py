@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_indexes'),
+        ('mappings', '0002_indexes'),
+        ('patients', '0003_constraint_validation'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='patientdoctormapping',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='patientdoctormapping',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('patient', 'doctor'), name='unique_active_patient_doctor'),
+        ),
+    ]
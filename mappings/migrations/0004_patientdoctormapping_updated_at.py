@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mappings', '0003_constraint_validation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientdoctormapping',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_change_feed'),
+        ('mappings', '0004_patientdoctormapping_updated_at'),
+        ('patients', '0004_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['updated_at', 'id'], name='mapping_updated_idx'),
+        ),
+    ]
@@ -8,10 +8,30 @@ class PatientDoctorMapping(models.Model):
     assigned_at = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        unique_together = ('patient', 'doctor')
         ordering = ['-assigned_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['patient', 'doctor'],
+                condition=models.Q(is_active=True),
+                name='unique_active_patient_doctor',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['patient', '-assigned_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='mapping_active_patient_idx',
+            ),
+            models.Index(
+                fields=['-assigned_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='mapping_active_assigned_idx',
+            ),
+            models.Index(fields=['updated_at', 'id'], name='mapping_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.name} -> Dr. {self.doctor.name}"
\ No newline at end of file
@@ -1,38 +1,32 @@
 from rest_framework import serializers
+from healthcare_backend.serializers import ConstraintValidationMixin
 from .models import PatientDoctorMapping
 from patients.serializers import PatientSerializer
 from doctors.serializers import DoctorSerializer
 
-class PatientDoctorMappingSerializer(serializers.ModelSerializer):
+MAPPING_UNIQUE_ERROR_MESSAGES = {
+    ('patient', 'doctor'): "This patient is already assigned to this doctor.",
+}
+
+# Patient columns left out of the nested patient_details of list rows (see PatientSerializer.list_fields)
+MAPPING_DEFERRED_PATIENT_FIELDS = ('patient__address', 'patient__medical_history')
+
+class PatientDoctorMappingSerializer(ConstraintValidationMixin, serializers.ModelSerializer):
     patient_details = PatientSerializer(source='patient', read_only=True)
     doctor_details = DoctorSerializer(source='doctor', read_only=True)
+    unique_error_messages = MAPPING_UNIQUE_ERROR_MESSAGES
     
     class Meta:
         model = PatientDoctorMapping
         fields = '__all__'
         read_only_fields = ('id', 'assigned_at')
 
-    def validate(self, attrs):
-        patient = attrs.get('patient')
-        doctor = attrs.get('doctor')
-        
-        # Check if mapping already exists
-        if self.instance is None:  # Creating new mapping
-            if PatientDoctorMapping.objects.filter(patient=patient, doctor=doctor, is_active=True).exists():
-                raise serializers.ValidationError("This patient is already assigned to this doctor.")
-        
-        return attrs
+class PatientDoctorMappingListSerializer(PatientDoctorMappingSerializer):
+    patient_details = PatientSerializer(source='patient', read_only=True, fields=PatientSerializer.list_fields)
+
+class PatientDoctorMappingCreateSerializer(ConstraintValidationMixin, serializers.ModelSerializer):
+    unique_error_messages = MAPPING_UNIQUE_ERROR_MESSAGES
 
-class PatientDoctorMappingCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = PatientDoctorMapping
-        fields = ('patient', 'doctor', 'notes')
-
-    def validate(self, attrs):
-        patient = attrs.get('patient')
-        doctor = attrs.get('doctor')
-        
-        if PatientDoctorMapping.objects.filter(patient=patient, doctor=doctor, is_active=True).exists():
-            raise serializers.ValidationError("This patient is already assigned to this doctor.")
-        
-        return attrs
\ No newline at end of file
+        fields = ('patient', 'doctor', 'notes')
\ No newline at end of file
@@ -1,3 +1,211 @@
+import asyncio
+import json
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from authentication.tests import OwnerTestCase, make_owner
+from changes.broker import broker
+from changes.models import Tombstone
+from healthcare_backend.readserializers import values_serializer
+from doctors.tests import make_doctors
+from patients.models import Patient
+from patients.tests import make_patients
+from .models import PatientDoctorMapping
+from .serializers import PatientDoctorMappingListSerializer, PatientDoctorMappingSerializer
+
+
+class MappingQueryCountTests(OwnerTestCase):
+    """Query counts for mapping endpoints must not grow with the row count"""
+
+    def setUp(self):
+        super().setUp()
+        self.patient = make_patients(self.user, 1)[0]
+
+    def assign(self, count, start=0):
+        for doctor in make_doctors(count, start=start):
+            PatientDoctorMapping.objects.create(patient=self.patient, doctor=doctor)
+
+    def assert_list_queries(self, url, expected):
+        self.assign(1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assign(20, start=1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_list(self):
+        self.assert_list_queries('/api/mappings/', 1)
+
+    def test_list_paginated(self):
+        self.assert_list_queries('/api/mappings/?page_size=10', 2)
+
+    def test_list_paginated_without_count(self):
+        self.assert_list_queries('/api/mappings/?page_size=10&count=none', 1)
+
+    def test_patient_doctors(self):
+        self.assert_list_queries(f'/api/mappings/patient/{self.patient.id}/', 2)
+
+    def test_nested_patient_leaves_out_large_columns(self):
+        self.assign(1)
+        with CaptureQueriesContext(connection) as queries:
+            mapping = self.client.get('/api/mappings/').json()['mappings'][0]
+        self.assertEqual(mapping['patient_details']['name'], self.patient.name)
+        self.assertNotIn('medical_history', mapping['patient_details'])
+        self.assertNotIn('medical_history', queries.captured_queries[0]['sql'])
+
+    def test_single_mapping_responses_nest_the_full_patient(self):
+        response = self.client.post('/api/mappings/', {'patient': self.patient.id, 'doctor': make_doctors(1)[0].id}, format='json')
+        self.assertEqual(response.json()['mapping']['patient_details']['medical_history'], self.patient.medical_history)
+        url = f"/api/mappings/{response.json()['mapping']['id']}/"
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json()['patient_details']['address'], self.patient.address)
+        response = self.client.patch(url, {'notes': 'Weekly'}, format='json')
+        self.assertEqual(response.json()['patient_details']['address'], self.patient.address)
+
+
+class MappingUniquenessTests(OwnerTestCase):
+    """Only active assignments are unique per patient and doctor"""
+
+    def setUp(self):
+        super().setUp()
+        self.patient = make_patients(self.user, 1)[0]
+        self.doctor = make_doctors(1)[0]
+
+    def assign(self):
+        return self.client.post('/api/mappings/', {'patient': self.patient.id, 'doctor': self.doctor.id}, format='json')
+
+    def test_duplicate_active_assignment_is_rejected(self):
+        self.assertEqual(self.assign().status_code, 201)
+        response = self.assign()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['details'],
+            {'non_field_errors': ['This patient is already assigned to this doctor.']},
+        )
+
+    def test_reassign_after_removal(self):
+        mapping_id = self.assign().json()['mapping']['id']
+        self.assertEqual(self.client.delete(f'/api/mappings/{mapping_id}/').status_code, 200)
+        self.assertEqual(self.assign().status_code, 201)
+
+
+class MappingConditionalRequestTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patient = make_patients(self.user, 1)[0]
+        self.doctor = make_doctors(1)[0]
+        self.mapping = PatientDoctorMapping.objects.create(patient=self.patient, doctor=self.doctor)
+        self.url = f'/api/mappings/{self.mapping.id}/'
+
+    def test_unchanged_detail_returns_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['id'], self.mapping.id)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The payload nests the doctor, so its changes count too
+        self.doctor.name = 'Renamed'
+        self.doctor.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_update_with_stale_if_match_is_rejected(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'notes': 'First'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.url, {'notes': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.mapping.refresh_from_db()
+        self.assertEqual(self.mapping.notes, 'First')
+
+
+class MappingEventTests(OwnerTestCase):
+    """Mapping changes are pushed to the owner's event subscribers after commit"""
+
+    def setUp(self):
+        super().setUp()
+        self.patient = make_patients(self.user, 1)[0]
+        self.doctor = make_doctors(1)[0]
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def subscribe(self, owner_id):
+        async def subscribe():
+            return broker.subscribe(owner_id)
+        subscriber = self.loop.run_until_complete(subscribe())
+        self.addCleanup(broker.unsubscribe, owner_id, subscriber)
+        return subscriber[1]
+
+    def receive(self, queue):
+        event_type, payload = self.loop.run_until_complete(asyncio.wait_for(queue.get(), timeout=1))
+        return event_type, json.loads(payload)
+
+    def test_assignment_and_removal_events(self):
+        queue = self.subscribe(self.user.id)
+        other = self.subscribe(self.user.id + 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/mappings/', {'patient': self.patient.id, 'doctor': self.doctor.id}, format='json')
+        mapping_id = response.json()['mapping']['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/mappings/{mapping_id}/')
+
+        event_type, data = self.receive(queue)
+        self.assertEqual(event_type, 'mapping.created')
+        self.assertEqual((data['id'], data['doctor']), (mapping_id, self.doctor.id))
+        self.assertEqual(self.receive(queue)[0], 'mapping.removed')
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.assertTrue(other.empty())
+
+    def test_stream_requires_token(self):
+        self.assertEqual(self.client.get('/api/events/').status_code, 401)
+
+
+class MappingTombstoneTests(OwnerTestCase):
+    """Deleted mappings are tombstoned under their patient's owner without a lookup per mapping"""
+
+    def setUp(self):
+        super().setUp()
+        self.patients = make_patients(self.user, 2)
+        for index, doctor in enumerate(make_doctors(4)):
+            PatientDoctorMapping.objects.create(patient=self.patients[index % 2], doctor=doctor)
+
+    def patient_lookups(self, queries):
+        table = Patient._meta.db_table
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and table in query['sql']]
+
+    def test_patient_delete_reuses_its_owner(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.patients[0].delete()
+        self.assertEqual(self.patient_lookups(queries), [])
+        self.assertEqual(
+            list(Tombstone.objects.filter(resource='mapping').values_list('owner_id', flat=True)), [self.user.id] * 2,
+        )
+
+    def test_queryset_delete_looks_owners_up_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            PatientDoctorMapping.objects.all().delete()
+        self.assertEqual(len(self.patient_lookups(queries)), 1)
+        self.assertEqual(
+            list(Tombstone.objects.filter(resource='mapping').values_list('owner_id', flat=True)), [self.user.id] * 4,
+        )
+
+
+class MappingValuesSerializerTests(TestCase):
+    """values()-based list serialization must match PatientDoctorMappingSerializer, nested details included"""
 
-# Create your tests here.
+    def test_matches_model_serializer(self):
+        user = make_owner()
+        patients = make_patients(user, 2)
+        for index, doctor in enumerate(make_doctors(3)):
+            PatientDoctorMapping.objects.create(patient=patients[index % 2], doctor=doctor, notes='' if index else 'Weekly')
+        queryset = PatientDoctorMapping.objects.select_related('patient__created_by', 'doctor').order_by('pk')
+        for serializer_class in (PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer):
+            with self.subTest(serializer_class.__name__):
+                reader = values_serializer(serializer_class)
+                self.assertEqual(
+                    json.dumps(reader.serialize(reader.values(queryset))),
+                    json.dumps(serializer_class(queryset, many=True).data),
+                )
@@ -1,14 +1,40 @@
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import PatientDoctorMapping
-from .serializers import PatientDoctorMappingSerializer, PatientDoctorMappingCreateSerializer
+from .serializers import MAPPING_DEFERRED_PATIENT_FIELDS, PatientDoctorMappingSerializer, PatientDoctorMappingCreateSerializer, PatientDoctorMappingListSerializer
 from patients.models import Patient
+from healthcare_backend.conditional import check_preconditions, instance_etag, is_conditional, queryset_etag, resolve, rows_etag, set_validators
+from healthcare_backend.exporting import EXPORT_RENDERER_CLASSES, stream_export
+from healthcare_backend.pagination import KeysetPagination
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.routers import ReplicaReadMixin
+from healthcare_backend.throttling import UserTokenBucketThrottle, UserWriteTokenBucketThrottle, scoped
+from changes.feed import change_feed
 
-class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
-    queryset = PatientDoctorMapping.objects.filter(is_active=True)
+class MappingPagination(KeysetPagination):
+    ordering = '-assigned_at'
+    results_key = 'mappings'
+
+# Mapping payloads nest the patient and doctor, so their changes count too
+MAPPING_ETAG_FIELDS = ('updated_at', 'patient__updated_at', 'doctor__updated_at')
+
+def mapping_validators(mapping):
+    """ETag and Last-Modified of a single mapping, including its nested patient and doctor"""
+    return {
+        'etag': instance_etag(mapping, fields=MAPPING_ETAG_FIELDS),
+        'last_modified': max(resolve(mapping, field) for field in MAPPING_ETAG_FIELDS),
+    }
+
+class PatientDoctorMappingViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = PatientDoctorMapping.objects.filter(is_active=True).select_related('patient__created_by', 'doctor')
     permission_classes = [IsAuthenticated]
+    throttle_classes = scoped('mappings', UserTokenBucketThrottle, UserWriteTokenBucketThrottle)
+    pagination_class = MappingPagination
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -22,17 +48,18 @@ class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
             if serializer.is_valid():
                 # Verify patient belongs to the requesting user
                 patient = serializer.validated_data['patient']
-                if patient.created_by != request.user:
+                if patient.created_by_id != request.user.id:
                     return Response({
                         'error': 'Permission denied',
                         'details': 'You can only assign doctors to your own patients'
                     }, status=status.HTTP_403_FORBIDDEN)
                 
                 mapping = serializer.save()
-                return Response({
-                    'message': 'Doctor assigned to patient successfully',
-                    'mapping': PatientDoctorMappingSerializer(mapping).data
-                }, status=status.HTTP_201_CREATED)
+                if mapping is not None:
+                    return Response({
+                        'message': 'Doctor assigned to patient successfully',
+                        'mapping': PatientDoctorMappingSerializer(mapping).data
+                    }, status=status.HTTP_201_CREATED)
             
             return Response({
                 'error': 'Assignment failed',
@@ -49,14 +76,57 @@ class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
         """Get all patient-doctor mappings"""
         try:
             # Filter to show only mappings for patients created by the user
-            user_patients = Patient.objects.filter(created_by=request.user)
-            queryset = self.get_queryset().filter(patient__in=user_patients)
-            serializer = self.get_serializer(queryset, many=True)
+            queryset = self.get_queryset().filter(patient__created_by=request.user)
+            reader = values_serializer(PatientDoctorMappingListSerializer)
+            rows = reader.values(queryset, extra=MAPPING_ETAG_FIELDS)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(reader.serialize(page))
             
-            return Response({
-                'count': queryset.count(),
-                'mappings': serializer.data
+            if is_conditional(request):
+                etag = queryset_etag(request, queryset, fields=MAPPING_ETAG_FIELDS)
+                response = check_preconditions(request, etag=etag)
+                if response is not None:
+                    return response
+            
+            rows = list(rows)
+            data = reader.serialize(rows)
+            
+            response = Response({
+                'count': len(data),
+                'mappings': data
             }, status=status.HTTP_200_OK)
+            return set_validators(response, etag=rows_etag(request, rows, fields=MAPPING_ETAG_FIELDS))
+        
+        except ParseError as e:
+            return Response({
+                'error': str(e.detail)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=EXPORT_RENDERER_CLASSES)
+    def export(self, request):
+        """Stream all active mappings for the user's patients as NDJSON or CSV"""
+        try:
+            queryset = PatientDoctorMapping.objects.filter(
+                is_active=True, patient__created_by=request.user
+            ).order_by('-assigned_at', '-id')
+            return stream_export(request, queryset, {
+                'id': 'id',
+                'patient': 'patient_id',
+                'patient_name': 'patient__name',
+                'doctor': 'doctor_id',
+                'doctor_name': 'doctor__name',
+                'doctor_specialty': 'doctor__specialty',
+                'assigned_at': 'assigned_at',
+                'notes': 'notes',
+                'is_active': 'is_active',
+            }, filename='mappings')
         
         except Exception as e:
             return Response({
@@ -76,13 +146,82 @@ class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             mappings = self.get_queryset().filter(patient_id=patient_id)
-            serializer = self.get_serializer(mappings, many=True)
+            if is_conditional(request):
+                etag = queryset_etag(request, mappings, fields=MAPPING_ETAG_FIELDS, extra=[patient.updated_at])
+                response = check_preconditions(request, etag=etag)
+                if response is not None:
+                    return response
             
-            return Response({
+            reader = values_serializer(PatientDoctorMappingListSerializer)
+            rows = list(reader.values(mappings, extra=MAPPING_ETAG_FIELDS))
+            data = reader.serialize(rows)
+            
+            response = Response({
                 'patient_name': patient.name,
-                'doctors_count': mappings.count(),
-                'mappings': serializer.data
+                'doctors_count': len(data),
+                'mappings': data
             }, status=status.HTTP_200_OK)
+            etag = rows_etag(request, rows, fields=MAPPING_ETAG_FIELDS, extra=[patient.updated_at])
+            return set_validators(response, etag=etag)
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def retrieve(self, request, pk=None):
+        """Get details of a specific mapping"""
+        try:
+            mapping = self.get_queryset().filter(pk=pk).first()
+            if not mapping:
+                return Response({
+                    'error': 'Mapping not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            validators = mapping_validators(mapping)
+            response = check_preconditions(request, **validators)
+            if response is not None:
+                return response
+            
+            serializer = self.get_serializer(mapping)
+            response = Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(response, **validators)
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @transaction.atomic
+    def update(self, request, pk=None, partial=False):
+        """Update a mapping (honours If-Match for optimistic concurrency)"""
+        try:
+            queryset = self.get_queryset()
+            if is_conditional(request):
+                queryset = queryset.select_for_update(of=('self',))
+            mapping = queryset.filter(pk=pk).first()
+            if not mapping:
+                return Response({
+                    'error': 'Mapping not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            response = check_preconditions(request, **mapping_validators(mapping))
+            if response is not None:
+                return response
+            
+            serializer = self.get_serializer(mapping, data=request.data, partial=partial)
+            if serializer.is_valid():
+                mapping = serializer.save()
+                if mapping is not None:
+                    response = Response(serializer.data, status=status.HTTP_200_OK)
+                    return set_validators(response, **mapping_validators(mapping))
+            
+            return Response({
+                'error': 'Mapping update failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         except Exception as e:
             return Response({
@@ -100,7 +239,7 @@ class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_404_NOT_FOUND)
             
             # Verify patient belongs to the requesting user
-            if mapping.patient.created_by != request.user:
+            if mapping.patient.created_by_id != request.user.id:
                 return Response({
                     'error': 'Permission denied',
                     'details': 'You can only modify mappings for your own patients'
@@ -113,6 +252,25 @@ class PatientDoctorMappingViewSet(viewsets.ModelViewSet):
                 'message': 'Doctor removed from patient successfully'
             }, status=status.HTTP_200_OK)
         
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """Mappings assigned, updated or removed after the since cursor"""
+        try:
+            return change_feed(
+                request,
+                PatientDoctorMapping.objects.filter(patient__created_by=request.user).select_related('patient__created_by', 'doctor').defer(*MAPPING_DEFERRED_PATIENT_FIELDS),
+                PatientDoctorMappingListSerializer,
+                resource='mapping',
+                owner_id=request.user.id,
+                removed=Q(is_active=False),
+            )
+        
         except Exception as e:
             return Response({
                 'error': 'Internal server error',
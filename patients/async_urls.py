@@ -0,0 +1,7 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.patient_list, name='async-patient-list'),
+    path('<int:pk>/', async_views.patient_detail, name='async-patient-detail'),
+]
@@ -0,0 +1,84 @@
+from rest_framework import status
+from rest_framework.decorators import throttle_classes
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.response import Response
+from .filters import filter_patients, parse_ordering
+from .models import Patient
+from .serializers import PatientSerializer
+from .views import PATIENT_REQUIRED_FIELDS, PatientPagination, PatientViewSet
+from healthcare_backend.asyncviews import async_api_view
+from healthcare_backend.conditional import (
+    aqueryset_etag, check_preconditions, instance_etag, is_conditional, rows_etag, set_validators,
+)
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.serializers import deferred_columns, requested_fields
+
+def get_queryset(request):
+    return Patient.objects.filter(created_by=request.user).select_related('created_by')
+
+@async_api_view
+@throttle_classes(PatientViewSet.throttle_classes)
+async def patient_list(request):
+    """Get all patients created by the authenticated user"""
+    paginator = PatientPagination()
+    try:
+        queryset = filter_patients(get_queryset(request), request.query_params)
+        paginator.ordering = parse_ordering(request.query_params, default=(paginator.ordering,))
+        queryset = queryset.order_by(*paginator.ordering, '-pk' if paginator.ordering[0].startswith('-') else 'pk')
+        fields = requested_fields(request, PatientSerializer, default=PatientSerializer.list_fields)
+        reader = values_serializer(PatientSerializer, fields)
+        rows = reader.values(queryset, extra=['updated_at'] + [field.lstrip('-') for field in paginator.ordering])
+        page = await paginator.apaginate_queryset(rows, request)
+    except ValidationError as e:
+        return Response({
+            'error': 'Invalid query parameters',
+            'details': e.detail
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except ParseError as e:
+        return Response({
+            'error': str(e.detail)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if page is not None:
+        return paginator.get_paginated_response(reader.serialize(page))
+    
+    if is_conditional(request):
+        response = check_preconditions(request, etag=await aqueryset_etag(request, queryset))
+        if response is not None:
+            return response
+    
+    rows = [row async for row in rows.aiterator()]
+    data = reader.serialize(rows)
+    
+    response = Response({
+        'count': len(data),
+        'patients': data
+    }, status=status.HTTP_200_OK)
+    return set_validators(response, etag=rows_etag(request, rows))
+
+@async_api_view
+@throttle_classes(PatientViewSet.throttle_classes)
+async def patient_detail(request, pk):
+    """Get details of a specific patient"""
+    try:
+        fields = requested_fields(request, PatientSerializer)
+    except ValidationError as e:
+        return Response({
+            'error': 'Invalid query parameters',
+            'details': e.detail
+        }, status=status.HTTP_400_BAD_REQUEST)
+    queryset = get_queryset(request).defer(*deferred_columns(PatientSerializer, fields, keep=PATIENT_REQUIRED_FIELDS))
+    patient = await queryset.filter(pk=pk).afirst()
+    if not patient:
+        return Response({
+            'error': 'Patient not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    etag = instance_etag(patient)
+    response = check_preconditions(request, etag=etag, last_modified=patient.updated_at)
+    if response is not None:
+        return response
+    
+    response = Response({
+        'patient': PatientSerializer(patient, fields=fields).data
+    }, status=status.HTTP_200_OK)
+    return set_validators(response, etag=etag, last_modified=patient.updated_at)
@@ -0,0 +1,93 @@
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+from .models import Patient
+
+FILTER_PARAMS = ('gender', 'min_age', 'max_age', 'name', 'email')
+
+# Sort keys clients may combine with ``ordering``, each backed by an index
+# that starts with created_by (see Patient.Meta.indexes)
+PATIENT_ORDERINGS = {
+    ('created_at',): 'patient_owner_created_idx',
+    ('name',): 'patient_owner_name_idx',
+    ('date_of_birth',): 'patient_owner_dob_idx',
+    ('gender', 'date_of_birth'): 'patient_owner_gender_dob_idx',
+}
+
+
+def years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a non-leap year
+        return day.replace(year=day.year - years, day=28)
+
+
+def parse_age(params, key, errors):
+    value = params.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        age = int(value)
+    except ValueError:
+        age = -1
+    if not 0 <= age <= 150:
+        errors[key] = ['Must be a whole number of years between 0 and 150.']
+        return None
+    return age
+
+
+def filter_patients(queryset, params, today=None):
+    """
+    Apply the patient list filters from ``params``.
+
+    ``gender`` and ``email`` match exactly, ``name`` matches a
+    case-insensitive prefix, and ``min_age``/``max_age`` become a
+    ``date_of_birth`` range. Invalid values raise ``ValidationError`` with
+    one entry per parameter.
+    """
+    today = today or date.today()
+    errors = {}
+
+    gender = params.get('gender')
+    if gender and gender not in dict(Patient.GENDER_CHOICES):
+        errors['gender'] = [f"Must be one of: {', '.join(dict(Patient.GENDER_CHOICES))}."]
+    min_age = parse_age(params, 'min_age', errors)
+    max_age = parse_age(params, 'max_age', errors)
+    if min_age is not None and max_age is not None and min_age > max_age:
+        errors['max_age'] = ['Must not be less than min_age.']
+    if errors:
+        raise ValidationError(errors)
+
+    if gender:
+        queryset = queryset.filter(gender=gender)
+    if min_age is not None:
+        queryset = queryset.filter(date_of_birth__lte=years_before(today, min_age))
+    if max_age is not None:
+        # Still max_age until the day before the next birthday
+        queryset = queryset.filter(date_of_birth__gt=years_before(today, max_age + 1))
+    if params.get('name'):
+        queryset = queryset.filter(name__istartswith=params['name'])
+    if params.get('email'):
+        queryset = queryset.filter(email=params['email'])
+    return queryset
+
+
+def parse_ordering(params, default):
+    """
+    Sort keys from ``ordering``, e.g. ``-gender,-date_of_birth``: a
+    whitelisted combination with every key in the same direction, so its
+    index can be walked either way.
+    """
+    value = params.get('ordering')
+    if not value:
+        return default
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    fields = tuple(key.lstrip('-') for key in keys)
+    directions = {key.startswith('-') for key in keys}
+    if fields not in PATIENT_ORDERINGS or len(directions) != 1:
+        allowed = ', '.join(','.join(fields) for fields in PATIENT_ORDERINGS)
+        raise ValidationError({
+            'ordering': [f'Must be one of: {allowed} (optionally all prefixed with "-").']
+        })
+    return tuple(keys)
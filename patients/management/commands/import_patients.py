@@ -0,0 +1,20 @@
+from django.core.management.base import CommandError
+from authentication.models import User
+from healthcare_backend.importing import StreamingImportCommand
+from patients.serializers import PatientCreateSerializer
+
+
+class Command(StreamingImportCommand):
+    help = "Stream patients from a CSV or NDJSON file into the database"
+    serializer_class = PatientCreateSerializer
+    label = 'patients'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--owner', required=True, help='Email of the user the imported patients belong to')
+
+    def get_extra_values(self, options):
+        owner = User.objects.filter(email=options['owner']).first()
+        if owner is None:
+            raise CommandError(f"No user with email {options['owner']}")
+        return {'created_by': owner}
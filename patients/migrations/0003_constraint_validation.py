@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='patient',
+            name='patient_email_idx',
+        ),
+        migrations.AlterField(
+            model_name='patient',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+    ]
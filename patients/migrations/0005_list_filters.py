@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """AddIndex that only touches PostgreSQL databases (the operator class does not exist elsewhere)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0004_change_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'name', 'id'], name='patient_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'date_of_birth', 'id'], name='patient_owner_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_by', 'gender', 'date_of_birth', 'id'], name='patient_owner_gender_dob_idx'),
+        ),
+        AddPostgresIndex(
+            model_name='patient',
+            index=models.Index(models.F('created_by'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('name', output_field=models.TextField())), name='text_pattern_ops'), name='patient_owner_name_prefix_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -12,7 +14,7 @@ class Patient(models.Model):
     
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='patients')
     name = models.CharField(max_length=255)
-    email = models.EmailField()
+    email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20)
     date_of_birth = models.DateField()
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
@@ -23,6 +25,19 @@ class Patient(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', '-created_at', '-id'], name='patient_owner_created_idx'),
+            models.Index(fields=['created_by', 'updated_at', 'id'], name='patient_owner_updated_idx'),
+            # List filters and sorts (patients.filters)
+            models.Index(fields=['created_by', 'name', 'id'], name='patient_owner_name_idx'),
+            models.Index(fields=['created_by', 'date_of_birth', 'id'], name='patient_owner_dob_idx'),
+            models.Index(fields=['created_by', 'gender', 'date_of_birth', 'id'], name='patient_owner_gender_dob_idx'),
+            # PostgreSQL only (see migration 0005): matches name__istartswith's UPPER("name"::text) LIKE
+            models.Index(
+                'created_by', OpClass(Upper(Cast('name', output_field=models.TextField())), name='text_pattern_ops'),
+                name='patient_owner_name_prefix_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
\ No newline at end of file
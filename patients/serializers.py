@@ -1,26 +1,27 @@
 from rest_framework import serializers
+from healthcare_backend.serializers import ConstraintValidationMixin, SparseFieldsetMixin
 from .models import Patient
 
-class PatientSerializer(serializers.ModelSerializer):
+PATIENT_UNIQUE_ERROR_MESSAGES = {
+    'email': "A patient with this email already exists.",
+}
+
+class PatientSerializer(SparseFieldsetMixin, ConstraintValidationMixin, serializers.ModelSerializer):
     created_by = serializers.StringRelatedField(read_only=True)
+    unique_error_messages = PATIENT_UNIQUE_ERROR_MESSAGES
+    # address and medical_history are unbounded, so lists leave them out unless asked for
+    list_fields = ('id', 'created_by', 'name', 'email', 'phone', 'date_of_birth', 'gender', 'created_at', 'updated_at')
+    # Column behind each field values()-based reads cannot derive: str(user) is the email
+    values_sources = {'created_by': 'created_by__email'}
     
     class Meta:
         model = Patient
         fields = '__all__'
         read_only_fields = ('id', 'created_by', 'created_at', 'updated_at')
 
-    def validate_email(self, value):
-        patient_id = self.instance.id if self.instance else None
-        if Patient.objects.filter(email=value).exclude(id=patient_id).exists():
-            raise serializers.ValidationError("A patient with this email already exists.")
-        return value
+class PatientCreateSerializer(ConstraintValidationMixin, serializers.ModelSerializer):
+    unique_error_messages = PATIENT_UNIQUE_ERROR_MESSAGES
 
-class PatientCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Patient
-        fields = ('name', 'email', 'phone', 'date_of_birth', 'gender', 'address', 'medical_history')
-
-    def validate_email(self, value):
-        if Patient.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A patient with this email already exists.")
-        return value
\ No newline at end of file
+        fields = ('name', 'email', 'phone', 'date_of_birth', 'gender', 'address', 'medical_history')
\ No newline at end of file
@@ -1,3 +1,565 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from authentication.tests import OwnerTestCase, make_owner
+from authentication.revocation import revoked_tokens
+from healthcare_backend.exporting import accepts_gzip
+from healthcare_backend.importing import StreamingImportCommand
+from healthcare_backend.readserializers import ValuesSerializer, values_serializer
+from healthcare_backend.management.commands.explain_endpoints import SEQ_SCAN_PATTERNS, patient_filter_queries
+from .filters import years_before
+from .models import Patient
+from .serializers import PatientSerializer
+
+
+def make_patients(user, count, start=0):
+    return [
+        Patient.objects.create(
+            created_by=user,
+            name=f'Patient {i}',
+            email=f'patient{i}@example.com',
+            phone='5550100',
+            date_of_birth=date(1990, 1, 1),
+            gender='F',
+            address='1 Main Street',
+            medical_history='None',
+        )
+        for i in range(start, start + count)
+    ]
+
+
+class PatientQueryCountTests(OwnerTestCase):
+    """Query counts for patient endpoints must not grow with the row count"""
+
+    def assert_list_queries(self, url, expected):
+        make_patients(self.user, 1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        make_patients(self.user, 20, start=1)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_list(self):
+        self.assert_list_queries('/api/patients/', 1)
+
+    def test_list_paginated(self):
+        self.assert_list_queries('/api/patients/?page_size=10', 2)
+
+    def test_list_paginated_without_count(self):
+        self.assert_list_queries('/api/patients/?page_size=10&count=none', 1)
+
+    def test_list_sparse_fields(self):
+        # Deferred columns must not be loaded row by row afterwards
+        self.assert_list_queries('/api/patients/?fields=name&ordering=date_of_birth&page_size=10', 2)
+
+    def test_retrieve(self):
+        patient = make_patients(self.user, 1)[0]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(f'/api/patients/{patient.id}/').status_code, 200)
+
+
+class PatientPaginationTests(OwnerTestCase):
+    """Keyset cursors over the patient list"""
+
+    def setUp(self):
+        super().setUp()
+        make_patients(self.user, 7)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            ids += [patient['id'] for patient in body['patients']]
+            url = body['next']
+            pages += 1
+        return ids, pages
+
+    def test_cursor_round_trip(self):
+        expected = [patient['id'] for patient in self.client.get('/api/patients/').json()['patients']]
+        self.assertEqual(self.walk('/api/patients/?page_size=3'), (expected, 3))
+
+    def test_ties_on_the_ordering_field_are_broken_by_pk(self):
+        # Every patient shares one date_of_birth
+        ids, _ = self.walk('/api/patients/?ordering=date_of_birth&page_size=2')
+        self.assertEqual(ids, sorted(Patient.objects.values_list('id', flat=True)))
+        ids, _ = self.walk('/api/patients/?ordering=-date_of_birth&page_size=2')
+        self.assertEqual(ids, sorted(Patient.objects.values_list('id', flat=True), reverse=True))
+
+    def test_invalid_cursor_is_rejected(self):
+        cursor = self.client.get('/api/patients/?page_size=2').json()['next'].split('cursor=')[1]
+        for url in (
+            '/api/patients/?cursor=not-a-cursor',
+            # A created_at cursor does not fit the two-field gender,date_of_birth ordering
+            f'/api/patients/?ordering=gender,date_of_birth&cursor={cursor}',
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertEqual(response.json()['error'], 'Invalid cursor')
+
+    def test_count_modes(self):
+        self.assertEqual(self.client.get('/api/patients/?page_size=2').json()['count'], 7)
+        self.assertIsNone(self.client.get('/api/patients/?page_size=2&count=none').json()['count'])
+        estimate = self.client.get('/api/patients/?page_size=2&count=estimate').json()['count']
+        self.assertIsInstance(estimate, int)
+        if connection.vendor != 'postgresql':
+            # Planner statistics only exist on PostgreSQL; elsewhere the count is exact
+            self.assertEqual(estimate, 7)
+
+
+class PatientUniquenessTests(OwnerTestCase):
+    """Duplicate emails are rejected by the database constraint, not a pre-check query"""
+
+    def test_duplicate_email_returns_field_error(self):
+        existing = make_patients(self.user, 1)[0]
+        response = self.client.post('/api/patients/', {
+            'name': 'Duplicate',
+            'email': existing.email,
+            'phone': '5550100',
+            'date_of_birth': '1990-01-01',
+            'gender': 'M',
+            'address': '2 Main Street',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['details'], {'email': ['A patient with this email already exists.']})
+        self.assertEqual(Patient.objects.count(), 1)
+
+
+class PatientBulkCreateTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.existing = make_patients(self.user, 1)[0]
+
+    def payload(self, count):
+        return [
+            {
+                'name': f'Bulk {i}',
+                'email': f'bulk{i}@example.com',
+                'phone': '5550100',
+                'date_of_birth': '1985-06-15',
+                'gender': 'O',
+                'address': '3 Main Street',
+            }
+            for i in range(count)
+        ]
+
+    def test_atomic_mode_rejects_whole_batch(self):
+        rows = self.payload(3)
+        rows[1]['email'] = self.existing.email
+        response = self.client.post('/api/patients/bulk/', rows, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['details'], [
+            {'index': 1, 'errors': {'email': ['A patient with this email already exists.']}},
+        ])
+        self.assertEqual(Patient.objects.count(), 1)
+
+    def test_partial_mode_inserts_valid_rows(self):
+        rows = self.payload(3)
+        rows[2]['email'] = rows[0]['email']
+        with self.assertNumQueries(4):
+            response = self.client.post('/api/patients/bulk/?mode=partial', rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created_count'], 2)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [2])
+        self.assertEqual(Patient.objects.filter(created_by=self.user).count(), 3)
+
+
+class PatientImportTests(OwnerTestCase):
+    """import_patients on the bulk_create path: duplicates and bad rows go to the rejects file, checkpoints resume"""
+
+    def setUp(self):
+        super().setUp()
+        self.existing = make_patients(self.user, 1)[0]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'patients.ndjson'
+        row = {
+            'phone': '5550100', 'date_of_birth': '1985-06-15', 'gender': 'O', 'address': '3 Main Street',
+        }
+        lines = [
+            json.dumps({**row, 'name': 'Import 1', 'email': 'import1@example.com'}),
+            json.dumps({**row, 'name': 'Existing', 'email': self.existing.email}),
+            '{"name": "Truncated", "email": ',
+            json.dumps({**row, 'name': 'Import 2', 'email': 'import2@example.com'}),
+            json.dumps({**row, 'name': 'Bad gender', 'email': 'bad@example.com', 'gender': 'X'}),
+            json.dumps({**row, 'name': 'Import 1 again', 'email': 'import1@example.com'}),
+            json.dumps({**row, 'name': 'Import 3', 'email': 'import3@example.com'}),
+        ]
+        self.path.write_text('\n'.join(lines) + '\n')
+
+    def run_import(self, **options):
+        call_command('import_patients', str(self.path), owner=self.user.email, chunk_size=2, stdout=StringIO(), **options)
+
+    def rejects(self):
+        with open(f'{self.path}.rejects.ndjson') as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_rows_are_inserted_once_and_failures_rejected(self):
+        self.run_import()
+
+        self.assertEqual(
+            set(Patient.objects.filter(created_by=self.user).values_list('email', flat=True)),
+            {self.existing.email, 'import1@example.com', 'import2@example.com', 'import3@example.com'},
+        )
+        rejects = self.rejects()
+        self.assertEqual([reject['row'] for reject in rejects], [2, 3, 5, 6])
+        self.assertEqual(rejects[0]['errors'], {'email': ['A patient with this email already exists.']})
+        self.assertIn('Invalid JSON', rejects[1]['errors']['non_field_errors'][0])
+        self.assertEqual(rejects[1]['data'], '{"name": "Truncated", "email": ')
+        self.assertIn('gender', rejects[2]['errors'])
+        self.assertEqual(rejects[3]['errors'], {'email': ['A patient with this email already exists.']})
+        self.assertEqual(json.loads(Path(f'{self.path}.checkpoint').read_text()), {'offset': 7})
+
+    def test_resume_continues_after_the_last_committed_chunk(self):
+        merge = StreamingImportCommand.merge_with_bulk_create
+        calls = []
+
+        def interrupted(command, valid, extra_values):
+            calls.append(len(valid))
+            if len(calls) > 1:
+                raise RuntimeError('interrupted')
+            return merge(command, valid, extra_values)
+
+        with mock.patch.object(StreamingImportCommand, 'merge_with_bulk_create', interrupted):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.assertEqual(json.loads(Path(f'{self.path}.checkpoint').read_text()), {'offset': 2})
+        self.assertEqual(Patient.objects.filter(email='import1@example.com').count(), 1)
+
+        self.run_import(resume=True)
+
+        self.assertEqual(Patient.objects.filter(created_by=self.user).count(), 4)
+        self.assertEqual([reject['row'] for reject in self.rejects()], [2, 3, 5, 6])
+
+
+class PatientExportTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        make_patients(self.user, 3)
+
+    def test_ndjson_export_streams_one_record_per_line(self):
+        response = self.client.get('/api/patients/export/?format=ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['created_by'], 'owner@example.com')
+
+    def test_csv_export_is_gzipped_when_accepted(self):
+        response = self.client.get('/api/patients/export/?format=csv', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        rows = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(rows[0].split(',')[:3], ['id', 'name', 'email'])
+        self.assertEqual(len(rows), 4)
+
+    def test_gzip_refused_with_zero_quality(self):
+        for accept_encoding in ('gzip;q=0, identity', 'br, *;q=0', 'gzip; q=0.0'):
+            response = self.client.get('/api/patients/export/?format=csv', HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertFalse(response.has_header('Content-Encoding'), accept_encoding)
+        self.assertTrue(accepts_gzip('br;q=1.0, *;q=0.5'))
+
+    async def test_asgi_export_streams_asynchronously(self):
+        response = await self.async_client.get(
+            '/api/patients/export/?format=ndjson', headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'},
+        )
+
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+
+class PatientConditionalRequestTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patient = make_patients(self.user, 2)[0]
+
+    def test_unchanged_list_returns_not_modified(self):
+        etag = self.client.get('/api/patients/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/patients/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make_patients(self.user, 1, start=2)
+        self.assertEqual(self.client.get('/api/patients/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_update_with_stale_if_match_is_rejected(self):
+        url = f'/api/patients/{self.patient.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.put(url, {'name': 'First'}, format='json', HTTP_IF_MATCH=etag).status_code, 200)
+
+        response = self.client.put(url, {'name': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.patient.refresh_from_db()
+        self.assertEqual(self.patient.name, 'First')
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class PatientChangeFeedTests(OwnerTestCase):
+    def test_feed_resumes_from_cursor_and_reports_deletes(self):
+        first, second = make_patients(self.user, 2)
+        response = self.client.get('/api/patients/changes/').json()
+        self.assertEqual([change['id'] for change in response['changes']], [first.id, second.id])
+
+        deleted_id = first.id
+        first.delete()
+        response = self.client.get(f"/api/patients/changes/?since={response['next_since']}").json()
+        self.assertEqual(response['changes'], [
+            {'op': 'delete', 'id': deleted_id, 'changed_at': response['changes'][0]['changed_at']},
+        ])
+
+
+    def test_feed_waits_for_open_write_transactions(self):
+        first = make_patients(self.user, 1)[0]
+        # A long import started before the first patient and is still open
+        with mock.patch('changes.feed.oldest_open_write', return_value=first.updated_at - timedelta(seconds=1)):
+            response = self.client.get('/api/patients/changes/').json()
+        self.assertEqual(response['changes'], [])
+
+        # It commits a row written before the first patient
+        late = make_patients(self.user, 1, start=1)[0]
+        Patient.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(microseconds=1))
+        response = self.client.get(f"/api/patients/changes/?since={response['next_since'] or ''}").json()
+        self.assertEqual([change['id'] for change in response['changes']], [late.id, first.id])
+
+
+class PatientAsyncReadTests(OwnerTestCase):
+    """The async read endpoints return the same payloads as the viewset"""
+    authenticate = False
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.patients = make_patients(self.user, 3)
+
+    def test_list_and_detail_match_viewset(self):
+        for query in ('', '?page_size=2'):
+            self.assertEqual(
+                self.client.get(f'/api/async/patients/{query}').json()['patients'],
+                self.client.get(f'/api/patients/{query}').json()['patients'],
+            )
+        patient_id = self.patients[0].id
+        response = self.client.get(f'/api/async/patients/{patient_id}/')
+        self.assertEqual(response.json(), self.client.get(f'/api/patients/{patient_id}/').json())
+        not_modified = self.client.get(f'/api/async/patients/{patient_id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_list_queries(self):
+        # The user comes from the snapshot cache, so only the patients are queried
+        revoked_tokens.sync()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/async/patients/').status_code, 200)
+
+    def test_requires_valid_token(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/api/async/patients/').status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get('/api/async/patients/').status_code, 401)
+
+
+# Needs a replica that is a separate database, e.g. two SQLite files, so that
+# reads served by it visibly miss writes made on the primary
+SEPARATE_REPLICAS = [
+    alias for alias in settings.REPLICA_DATABASES
+    if settings.DATABASES[alias].get('TEST', {}).get('MIRROR') is None
+]
+
+
+@skipUnless(SEPARATE_REPLICAS, 'requires a replica configured as a separate database')
+class PatientReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', *SEPARATE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_owner()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        make_patients(self.user, 2)
+
+    def test_reads_use_replica_until_client_writes(self):
+        # Nothing has been replicated, so the replica sees no patients
+        self.assertEqual(self.client.get('/api/patients/').json()['count'], 0)
+
+        response = self.client.post('/api/patients/', {
+            'name': 'New', 'email': 'new@example.com', 'phone': '5550100', 'date_of_birth': '1990-01-01',
+            'gender': 'F', 'address': '1 Main Street', 'medical_history': 'None',
+        }, format='json')
+        self.assertIn(settings.DB_STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.client.get('/api/patients/').json()['count'], 3)
+
+        # Token clients without the cookie stay pinned through the cache
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get('/api/patients/').json()['count'], 3)
+
+    @override_settings(DB_REPLICA_POLICY='least_lag')
+    def test_least_lag_policy(self):
+        self.assertEqual(self.client.get('/api/patients/').json()['count'], 0)
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+    def test_change_feed_reads_primary(self):
+        self.assertEqual(len(self.client.get('/api/patients/changes/').json()['changes']), 2)
+
+
+class PatientFilterTests(OwnerTestCase):
+    """List filters and sorts, each served by an index rather than a sequential scan"""
+
+    def setUp(self):
+        super().setUp()
+        today = date.today()
+        rows = [
+            ('Joan Smith', 'F', 25), ('John Doe', 'M', 35), ('Josie Park', 'F', 40),
+            ('Maria Gomez', 'F', 41), ('Omar Ali', 'O', 60),
+        ]
+        for i, (name, gender, age) in enumerate(rows):
+            Patient.objects.create(
+                created_by=self.user, name=name, email=f'filter{i}@example.com', phone='5550100',
+                date_of_birth=years_before(today, age),
+                gender=gender, address='1 Main Street',
+            )
+
+    def names(self, **params):
+        response = self.client.get('/api/patients/', params)
+        self.assertEqual(response.status_code, 200)
+        return [patient['name'] for patient in response.json()['patients']]
+
+    def test_filters(self):
+        self.assertEqual(self.names(gender='F', ordering='name'), ['Joan Smith', 'Josie Park', 'Maria Gomez'])
+        self.assertEqual(self.names(min_age=35, max_age=40, ordering='name'), ['John Doe', 'Josie Park'])
+        self.assertEqual(self.names(name='jo', gender='F', ordering='name'), ['Joan Smith', 'Josie Park'])
+        self.assertEqual(self.names(email='filter4@example.com'), ['Omar Ali'])
+
+    def test_multi_key_ordering_paginates_with_cursors(self):
+        expected = self.names(ordering='-gender,-date_of_birth')
+        self.assertEqual(expected[:2], ['Omar Ali', 'John Doe'])
+        seen, url = [], '/api/patients/?ordering=-gender,-date_of_birth&page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            seen += [patient['name'] for patient in body['patients']]
+            url = body['next']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_filters_and_orderings_are_rejected(self):
+        for params in ({'gender': 'X'}, {'min_age': 'old'}, {'min_age': 50, 'max_age': 20},
+                       {'ordering': 'address'}, {'ordering': 'gender,-date_of_birth'}):
+            response = self.client.get('/api/patients/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.json()['error'], 'Invalid query parameters')
+
+    def test_async_list_filters_and_sorts_like_the_viewset(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        for params in ({'gender': 'F', 'ordering': 'name'}, {'min_age': 35, 'ordering': '-date_of_birth'},
+                       {'name': 'jo', 'ordering': '-gender,-date_of_birth', 'page_size': 2}):
+            response = self.client.get('/api/async/patients/', params)
+            self.assertEqual(response.status_code, 200, params)
+            expected = self.client.get('/api/patients/', params).json()
+            # Same rows and, when paginated, the same cursor
+            self.assertEqual(
+                json.loads(response.content.replace(b'/api/async/patients/', b'/api/patients/')), expected, params,
+            )
+
+        for params in ({'gender': 'X'}, {'ordering': 'address'}):
+            response = self.client.get('/api/async/patients/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.json()['error'], 'Invalid query parameters')
+
+    @skipUnless(connection.vendor in SEQ_SCAN_PATTERNS, 'EXPLAIN parsing is not available for this backend')
+    def test_no_filter_combination_scans_the_table(self):
+        pattern = SEQ_SCAN_PATTERNS[connection.vendor]
+        queryset = Patient.objects.filter(created_by=self.user)
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small test tables would otherwise be scanned regardless of indexes
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for label, query in patient_filter_queries(queryset, page_size=20):
+                self.assertEqual(pattern.findall(query.explain()), [], label)
+
+
+class PatientSparseFieldsetTests(OwnerTestCase):
+    """Lists leave the large text columns out; ?fields= narrows both the payload and the SELECT"""
+
+    def setUp(self):
+        super().setUp()
+        self.patient, self.newest = make_patients(self.user, 2)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_list_defaults_to_slim_rows(self):
+        body, sql = self.get('/api/patients/')
+        self.assertEqual(set(body['patients'][0]), {
+            'id', 'created_by', 'name', 'email', 'phone', 'date_of_birth', 'gender', 'created_at', 'updated_at',
+        })
+        self.assertNotIn('medical_history', sql)
+        self.assertNotIn('"address"', sql)
+
+    def test_fields_narrow_list_and_detail(self):
+        body, sql = self.get('/api/patients/?fields=name,medical_history')
+        self.assertEqual(body['patients'][0], {'id': self.newest.id, 'name': 'Patient 1', 'medical_history': 'None'})
+        self.assertNotIn('"phone"', sql)
+
+        body, sql = self.get(f'/api/patients/{self.patient.id}/')
+        self.assertEqual(body['patient']['address'], '1 Main Street')
+        body, sql = self.get(f'/api/patients/{self.patient.id}/?fields=email')
+        self.assertEqual(body['patient'], {'id': self.patient.id, 'email': 'patient0@example.com'})
+        self.assertNotIn('medical_history', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        for url in ('/api/patients/?fields=name,ssn', f'/api/patients/{self.patient.id}/?fields=ssn'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('ssn', response.json()['details']['fields'][0])
+
+
+class PatientValuesSerializerTests(TestCase):
+    """values()-based list serialization must match PatientSerializer exactly"""
+
+    def setUp(self):
+        self.user = make_owner()
+        make_patients(self.user, 3)
+        Patient.objects.filter(name='Patient 1').update(medical_history='', address='Flat 2\n1 Main Street')
+
+    def test_matches_model_serializer(self):
+        queryset = Patient.objects.filter(created_by=self.user).select_related('created_by').order_by('pk')
+        for fields in (None, PatientSerializer.list_fields, ['email', 'date_of_birth', 'created_by']):
+            for zone in ('UTC', 'America/New_York'):
+                with self.subTest(fields=fields, zone=zone), timezone.override(zone):
+                    reader = values_serializer(PatientSerializer, fields)
+                    # Compared as JSON so key order counts too
+                    self.assertEqual(
+                        json.dumps(reader.serialize(reader.values(queryset))),
+                        json.dumps(PatientSerializer(queryset, many=True, fields=fields).data),
+                    )
+
+    def test_fields_without_a_column_must_be_mapped(self):
+        class OwnerSerializer(serializers.ModelSerializer):
+            created_by = serializers.StringRelatedField()
+
+            class Meta:
+                model = Patient
+                fields = ('id', 'created_by')
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(OwnerSerializer)
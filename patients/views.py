@@ -1,14 +1,38 @@
+from django.db import transaction
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from .filters import filter_patients, parse_ordering
 from .models import Patient
 from .serializers import PatientSerializer, PatientCreateSerializer
+from healthcare_backend.conditional import (
+    check_preconditions, instance_etag, is_conditional, queryset_etag, rows_etag, set_validators,
+)
+from healthcare_backend.bulk import BulkCreateError, bulk_create_records
+from healthcare_backend.exporting import EXPORT_RENDERER_CLASSES, stream_export
+from healthcare_backend.pagination import KeysetPagination
+from healthcare_backend.readserializers import values_serializer
+from healthcare_backend.routers import ReplicaReadMixin
+from healthcare_backend.serializers import deferred_columns, requested_fields
+from healthcare_backend.throttling import UserTokenBucketThrottle, UserWriteTokenBucketThrottle, scoped
+from changes.feed import change_feed
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientPagination(KeysetPagination):
+    ordering = '-created_at'
+    results_key = 'patients'
+
+# Columns the views read whatever ?fields= asks for: the select_related owner and the ETag timestamp
+PATIENT_REQUIRED_FIELDS = ('created_by', 'updated_at')
+
+class PatientViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    throttle_classes = scoped('patients', UserTokenBucketThrottle, UserWriteTokenBucketThrottle)
+    pagination_class = PatientPagination
     
     def get_queryset(self):
-        return Patient.objects.filter(created_by=self.request.user)
+        return Patient.objects.filter(created_by=self.request.user).select_related('created_by')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -21,10 +45,11 @@ class PatientViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 patient = serializer.save(created_by=request.user)
-                return Response({
-                    'message': 'Patient created successfully',
-                    'patient': PatientSerializer(patient).data
-                }, status=status.HTTP_201_CREATED)
+                if patient is not None:
+                    return Response({
+                        'message': 'Patient created successfully',
+                        'patient': PatientSerializer(patient).data
+                    }, status=status.HTTP_201_CREATED)
             
             return Response({
                 'error': 'Patient creation failed',
@@ -38,15 +63,42 @@ class PatientViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def list(self, request):
-        """Get all patients created by the authenticated user"""
+        """Get all patients created by the authenticated user (filterable and sortable)"""
         try:
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
+            queryset = filter_patients(self.get_queryset(), request.query_params)
+            self.keyset_ordering = parse_ordering(request.query_params, default=(self.paginator.ordering,))
+            queryset = queryset.order_by(*self.keyset_ordering, '-pk' if self.keyset_ordering[0].startswith('-') else 'pk')
+            fields = requested_fields(request, PatientSerializer, default=PatientSerializer.list_fields)
+            reader = values_serializer(PatientSerializer, fields)
+            rows = reader.values(queryset, extra=['updated_at'] + [field.lstrip('-') for field in self.keyset_ordering])
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(reader.serialize(page))
             
-            return Response({
-                'count': queryset.count(),
-                'patients': serializer.data
+            if is_conditional(request):
+                response = check_preconditions(request, etag=queryset_etag(request, queryset))
+                if response is not None:
+                    return response
+            
+            rows = list(rows)
+            data = reader.serialize(rows)
+            
+            response = Response({
+                'count': len(data),
+                'patients': data
             }, status=status.HTTP_200_OK)
+            return set_validators(response, etag=rows_etag(request, rows))
+        
+        except ValidationError as e:
+            return Response({
+                'error': 'Invalid query parameters',
+                'details': e.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        except ParseError as e:
+            return Response({
+                'error': str(e.detail)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         except Exception as e:
             return Response({
@@ -57,16 +109,30 @@ class PatientViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, pk=None):
         """Get details of a specific patient"""
         try:
-            patient = self.get_queryset().filter(pk=pk).first()
+            fields = requested_fields(request, PatientSerializer)
+            queryset = self.get_queryset().defer(*deferred_columns(PatientSerializer, fields, keep=PATIENT_REQUIRED_FIELDS))
+            patient = queryset.filter(pk=pk).first()
             if not patient:
                 return Response({
                     'error': 'Patient not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            serializer = self.get_serializer(patient)
-            return Response({
+            etag = instance_etag(patient)
+            response = check_preconditions(request, etag=etag, last_modified=patient.updated_at)
+            if response is not None:
+                return response
+            
+            serializer = self.get_serializer(patient, fields=fields)
+            response = Response({
                 'patient': serializer.data
             }, status=status.HTTP_200_OK)
+            return set_validators(response, etag=etag, last_modified=patient.updated_at)
+        
+        except ValidationError as e:
+            return Response({
+                'error': 'Invalid query parameters',
+                'details': e.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         except Exception as e:
             return Response({
@@ -74,22 +140,32 @@ class PatientViewSet(viewsets.ModelViewSet):
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @transaction.atomic
     def update(self, request, pk=None):
-        """Update patient details"""
+        """Update patient details (honours If-Match for optimistic concurrency)"""
         try:
-            patient = self.get_queryset().filter(pk=pk).first()
+            queryset = self.get_queryset()
+            if is_conditional(request):
+                queryset = queryset.select_for_update(of=('self',))
+            patient = queryset.filter(pk=pk).first()
             if not patient:
                 return Response({
                     'error': 'Patient not found'
                 }, status=status.HTTP_404_NOT_FOUND)
             
+            response = check_preconditions(request, etag=instance_etag(patient), last_modified=patient.updated_at)
+            if response is not None:
+                return response
+            
             serializer = self.get_serializer(patient, data=request.data, partial=True)
             if serializer.is_valid():
                 patient = serializer.save()
-                return Response({
-                    'message': 'Patient updated successfully',
-                    'patient': PatientSerializer(patient).data
-                }, status=status.HTTP_200_OK)
+                if patient is not None:
+                    response = Response({
+                        'message': 'Patient updated successfully',
+                        'patient': PatientSerializer(patient).data
+                    }, status=status.HTTP_200_OK)
+                    return set_validators(response, etag=instance_etag(patient), last_modified=patient.updated_at)
             
             return Response({
                 'error': 'Patient update failed',
@@ -116,6 +192,81 @@ class PatientViewSet(viewsets.ModelViewSet):
                 'message': 'Patient deleted successfully'
             }, status=status.HTTP_200_OK)
         
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create many patients in one request"""
+        try:
+            mode = request.query_params.get('mode', 'atomic')
+            created, errors = bulk_create_records(PatientCreateSerializer, request.data, mode=mode, created_by=request.user)
+            
+            if not created:
+                return Response({
+                    'error': 'Bulk patient creation failed',
+                    'details': errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                'message': 'Patients created successfully',
+                'created_count': len(created),
+                'patients': PatientSerializer(created, many=True).data,
+                'errors': errors
+            }, status=status.HTTP_201_CREATED)
+        
+        except BulkCreateError as e:
+            return Response({
+                'error': 'Bulk patient creation failed',
+                'details': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=EXPORT_RENDERER_CLASSES)
+    def export(self, request):
+        """Stream all patients of the authenticated user as NDJSON or CSV"""
+        try:
+            queryset = Patient.objects.filter(created_by=request.user).order_by('-created_at', '-id')
+            return stream_export(request, queryset, {
+                'id': 'id',
+                'name': 'name',
+                'email': 'email',
+                'phone': 'phone',
+                'date_of_birth': 'date_of_birth',
+                'gender': 'gender',
+                'address': 'address',
+                'medical_history': 'medical_history',
+                'created_by': 'created_by__email',
+                'created_at': 'created_at',
+                'updated_at': 'updated_at',
+            }, filename='patients')
+        
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """Patients created, updated or deleted after the since cursor"""
+        try:
+            return change_feed(
+                request,
+                Patient.objects.filter(created_by=request.user).select_related('created_by'),
+                PatientSerializer,
+                resource='patient',
+                owner_id=request.user.id,
+            )
+        
         except Exception as e:
             return Response({
                 'error': 'Internal server error',